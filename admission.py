@@ -0,0 +1,167 @@
+"""Google Home Web Controller - Admission control
+
+Assistant requests hold a worker for many seconds (LLM + TTS + cast). The
+AdmissionLimiter caps how many run at once, lets a bounded number wait
+for a slot, and rejects the rest immediately with a retry hint, so a burst
+can neither starve the control endpoints nor hammer the LLM rate limits.
+Control endpoints do not pass through a limiter, which keeps their
+capacity reserved.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+
+class Saturated(Exception):
+    """Raised when a request cannot be admitted; retry_after is in seconds."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Saturated, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AdmissionLimiter:
+    """Bounded concurrency with a bounded wait queue."""
+
+    def __init__(self, max_concurrent, max_waiting, wait_timeout, expected_duration=5.0):
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._avg_duration = expected_duration  # EWMA of request durations
+        self._cond = threading.Condition()
+        self._async_waiters = deque()  # futures of async waiters, oldest first
+        self._sync_waiting = 0  # threads waiting in _acquire() without a slot yet
+        self._handoffs = 0  # slots released to waiting threads, not yet taken
+
+    @contextmanager
+    def slot(self):
+        """Hold a slot for the duration of the block; raises Saturated if full."""
+        self._acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(time.monotonic() - started)
+
+    @asynccontextmanager
+    async def aslot(self):
+        """Async variant of slot(); waits without blocking the event loop."""
+        await self._acquire_async()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(time.monotonic() - started)
+
+    def _acquire(self):
+        with self._cond:
+            # Only jump in directly if nobody is already waiting
+            if self.active < self.max_concurrent and self.waiting == 0:
+                self.active += 1
+                self.admitted += 1
+                return
+            if self.waiting >= self.max_waiting:
+                self.rejected += 1
+                raise Saturated(self._retry_after_locked())
+
+            self.waiting += 1
+            self._sync_waiting += 1
+            deadline = time.monotonic() + self.wait_timeout
+            # _release() hands its slot over and stops counting us as waiting,
+            # so the slot never looks free to newcomers in between
+            while not self._handoffs:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.waiting -= 1
+                    self._sync_waiting -= 1
+                    self.rejected += 1
+                    raise Saturated(self._retry_after_locked())
+                self._cond.wait(remaining)
+            self._handoffs -= 1
+            self.admitted += 1
+
+    async def _acquire_async(self):
+        # Same accounting as _acquire(); each async waiter parks on a future.
+        # A waiter counts as waiting while its future is in _async_waiters;
+        # whoever takes it out (handover, timeout, cancellation) does so
+        # under the lock and updates the counters at the same time. Sync and
+        # async requests never share a limiter within one process.
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            if self.active < self.max_concurrent and self.waiting == 0:
+                self.active += 1
+                self.admitted += 1
+                return
+            if self.waiting >= self.max_waiting:
+                self.rejected += 1
+                raise Saturated(self._retry_after_locked())
+            self.waiting += 1
+            waiter = loop.create_future()
+            self._async_waiters.append(waiter)
+
+        def expire():
+            with self._cond:
+                if waiter in self._async_waiters:
+                    self._async_waiters.remove(waiter)
+                    waiter.set_exception(Saturated(self._retry_after_locked()))
+                    self.waiting -= 1
+                    self.rejected += 1
+
+        timer = loop.call_later(self.wait_timeout, expire)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._cond:
+                if waiter in self._async_waiters:
+                    self._async_waiters.remove(waiter)
+                    self.waiting -= 1
+                elif waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                    # Cancelled right after the slot was handed over: pass it on
+                    self._release(None)
+            raise
+        finally:
+            timer.cancel()
+
+    def _release(self, duration):
+        with self._cond:
+            if duration is not None:
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+            # Hand the slot straight to the oldest waiter; it stops counting
+            # as waiting right away, and active stays unchanged
+            while self._async_waiters:
+                waiter = self._async_waiters.popleft()
+                self.waiting -= 1
+                if not waiter.done():
+                    waiter.set_result(None)
+                    self.admitted += 1
+                    return
+            if self._sync_waiting:
+                self._sync_waiting -= 1
+                self.waiting -= 1
+                self._handoffs += 1
+                self._cond.notify()
+                return
+            self.active -= 1
+
+    def _retry_after_locked(self):
+        # Caller holds self._cond
+        return max(1, math.ceil(self._avg_duration * (self.waiting + 1) / self.max_concurrent))
+
+    def stats(self):
+        with self._cond:
+            return {
+                "active": self.active,
+                "waiting": self.waiting,
+                "max_concurrent": self.max_concurrent,
+                "max_waiting": self.max_waiting,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+            }
@@ -1,30 +1,62 @@
 #!/usr/bin/env python3
 """Google Home Web Controller - Flask Backend"""
 
+import time
+
+# Measured from here so the startup log covers all imports below
+_startup_began = time.monotonic()
+
 import subprocess
 import json
 import re
-import time
 import os
+import sys
+import socket
 import tempfile
 import asyncio
+import threading
 import uuid
-import requests
+import random
+import functools
+from datetime import datetime
 import shutil
-from flask import Flask, render_template, jsonify, request, send_from_directory
-from groq import Groq, RateLimitError, APIStatusError
-import google.generativeai as genai
-import edge_tts
+from flask import Flask, render_template, jsonify, request, send_from_directory, make_response
+from prompt_builder import PromptBuilder, HistorySummarizer, to_gemini_contents
+from command_coalescer import CommandCoalescer
+from phrase_bank import PhraseBank
+from play_queue import PlayQueue, QueueItem
+from scheduler import Scheduler, REPEAT_DAILY
+from admission import AdmissionLimiter, Saturated
+from assets import AssetPipeline, IMMUTABLE_CACHE, choose_encoding, compress, content_etag
+from memory_backends import create_memory_backend
+from history_log import HistoryLog
+from request_dedup import InflightDeduplicator, normalize_text
+
+# groq, google.generativeai, edge_tts and requests are imported lazily:
+# the remote/media controls need none of them and together they take
+# over a second to import, which would slow every service restart.
 
 from config import (
     DEVICE, TTS_VOICE, ASSISTANT_PERSONA,
     RADIO_STATIONS, YOUTUBE_FAVORITES,
     LOCAL_IP, LOCAL_PORT, MAX_HISTORY,
+    PROMPT_TOKEN_BUDGET, HISTORY_SUMMARY_TOKENS,
+    ASSISTANT_WARMUP, STARTUP_BUDGET_MS,
+    SCHEDULE_FILE, SCHEDULER_PREWARM_SECONDS,
+    ASSISTANT_MAX_CONCURRENT, ASSISTANT_MAX_WAITING, ASSISTANT_WAIT_TIMEOUT,
+    ASSISTANT_DEDUP_WINDOW,
+    MEMORY_CONFIRMATION_PHRASES, ERROR_PHRASES, COMMON_PHRASES,
+    MEMORY_BACKEND, LOCAL_MEMORY_FILE,
+    HISTORY_FILE, HISTORY_FSYNC_INTERVAL, HISTORY_COMPACT_RECORDS,
     MEMORY_STORE_PATTERNS, MEMORY_SKIP_PATTERNS, MEMORY_RECALL_PATTERNS
 )
 
 app = Flask(__name__)
 
+# Minified, fingerprinted and precompressed JS/CSS, built once per start
+asset_pipeline = AssetPipeline(app.static_folder).build()
+app.jinja_env.globals["asset_url"] = asset_pipeline.url
+
 def format_api_error(error):
     """Convert API errors to user-friendly German messages."""
     error_str = str(error)
@@ -33,8 +65,9 @@ def format_api_error(error):
     if error_str.startswith(('API-Limit', 'API-Auth', 'Zeitüberschreitung', 'Verbindungsfehler', 'Fehler bei der')):
         return error_str
 
-    # Handle RateLimitError with headers
-    if isinstance(error, RateLimitError):
+    # Handle RateLimitError with headers (only possible once groq is loaded)
+    groq = sys.modules.get("groq")
+    if groq is not None and isinstance(error, groq.RateLimitError):
         try:
             headers = error.response.headers if hasattr(error, 'response') else {}
             remaining = headers.get('x-ratelimit-remaining-requests', '?')
@@ -79,16 +112,89 @@ def format_api_error(error):
 
     return f"Fehler: {error_str}"
 
+# State files live next to app.py unless moved via environment variable
+# (the load test points them at a temp dir to keep the real ones untouched)
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def state_file(env_var, filename):
+    """Path of a persisted state file: $env_var, else filename in APP_DIR."""
+    return os.environ.get(env_var) or os.path.join(APP_DIR, filename)
+
 # Groq API for LLM (set via environment variable)
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY", "")
-groq_client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
 
 # Gemini API as fallback (set via environment variable)
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "")
-gemini_model = None
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-    gemini_model = genai.GenerativeModel('gemini-1.5-flash')
+GEMINI_API_ENDPOINT = os.environ.get("GEMINI_API_ENDPOINT", "")  # e.g. local fake for benchmarks
+
+# Provider clients, created on first assistant use (see get_groq_client)
+_groq_client = None
+_gemini_model = None
+_provider_lock = threading.Lock()
+
+def get_groq_client():
+    """Return the Groq client, creating it on first use (None if no API key)."""
+    global _groq_client
+    if _groq_client is None and GROQ_API_KEY:
+        with _provider_lock:
+            if _groq_client is None:
+                from groq import Groq
+                _groq_client = Groq(api_key=GROQ_API_KEY)
+    return _groq_client
+
+def get_gemini_model():
+    """Return the Gemini model, configuring the SDK on first use (None if no API key)."""
+    global _gemini_model
+    if _gemini_model is None and GEMINI_API_KEY:
+        with _provider_lock:
+            if _gemini_model is None:
+                import google.generativeai as genai
+                if GEMINI_API_ENDPOINT:
+                    genai.configure(api_key=GEMINI_API_KEY, transport="rest",
+                                    client_options={"api_endpoint": GEMINI_API_ENDPOINT})
+                else:
+                    genai.configure(api_key=GEMINI_API_KEY)
+                # Persona as system instruction keeps the prompt prefix stable
+                _gemini_model = genai.GenerativeModel(
+                    GEMINI_MODEL, system_instruction=ASSISTANT_PERSONA)
+    return _gemini_model
+
+def warm_up_providers():
+    """Import and initialize everything the assistant needs ahead of first use."""
+    start = time.monotonic()
+    try:
+        get_groq_client()
+        get_gemini_model()
+        import requests  # noqa: F401
+        import edge_tts  # noqa: F401
+        if hasattr(memory_backend, "load"):
+            memory_backend.load()  # local engine: read the store and build the index
+        print(f"Assistant providers warmed up in {(time.monotonic() - start) * 1000:.0f} ms")
+    except Exception as e:
+        print(f"Assistant warm-up failed (will retry on first use): {e}")
+    phrase_bank.warm_in_background()
+
+def start_background_warmup(port):
+    """Log startup time once the server accepts connections, then warm up providers.
+
+    Runs on a daemon thread so the control UI is served before the
+    assistant's heavy imports happen.
+    """
+    def wait_and_warm():
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                    break
+            except OSError:
+                time.sleep(0.05)
+        elapsed_ms = (time.monotonic() - _startup_began) * 1000
+        note = "" if elapsed_ms <= STARTUP_BUDGET_MS else " - over budget!"
+        print(f"Startup: listening after {elapsed_ms:.0f} ms (budget {STARTUP_BUDGET_MS} ms){note}")
+        if ASSISTANT_WARMUP:
+            warm_up_providers()
+
+    threading.Thread(target=wait_and_warm, daemon=True).start()
 
 # Track which LLM was used for the last request
 last_llm_used = "none"
@@ -97,9 +203,18 @@ last_llm_used = "none"
 SHODH_URL = os.environ.get("SHODH_CLOUDFLARE_URL", "")
 SHODH_API_KEY = os.environ.get("SHODH_CLOUDFLARE_API_KEY", "")
 
-# In-memory conversation history
+# Conversation history (the last MAX_HISTORY exchanges verbatim, older ones
+# are folded into history_summarizer.summary); restored from history_log
+# by start_background_services()
 conversation_history = []
 
+# Chat models (Groq first, Gemini as fallback)
+CHAT_MODEL = "llama-3.3-70b-versatile"
+GEMINI_MODEL = "gemini-1.5-flash"
+
+# Model used for background history summaries (cheap and fast)
+SUMMARY_MODEL = "llama-3.1-8b-instant"
+
 def should_store_memory(text):
     """Check if this message should be stored in memory.
 
@@ -157,16 +272,16 @@ def extract_memory_content(text):
 
     return text
 
-# Audio files directory for casting
-AUDIO_DIR = "/tmp/ghome_audio"
+# Audio files directory for casting ($GHOME_AUDIO_DIR overrides it)
+AUDIO_DIR = os.environ.get("GHOME_AUDIO_DIR") or "/tmp/ghome_audio"
 os.makedirs(AUDIO_DIR, exist_ok=True)
 
 # Track current playing source
 current_source = {"type": None, "name": None}
 
-def run_catt(command, *args, background=False):
+def run_catt(command, *args, background=False, device=None):
     """Execute a catt command and return output."""
-    cmd = ["catt", "-d", DEVICE] + [command] + list(args)
+    cmd = ["catt", "-d", device or DEVICE] + [command] + list(args)
     try:
         if background:
             import os
@@ -181,6 +296,21 @@ def run_catt(command, *args, background=False):
     except Exception as e:
         return "", str(e), 1
 
+# Volume and seek bursts are merged per device and applied in order
+catt_coalescer = CommandCoalescer(
+    lambda device, command, *args: run_catt(command, *args, device=device)
+)
+
+# How long a request waits for its (possibly merged) command to finish
+COALESCED_COMMAND_TIMEOUT = 30
+
+def run_coalesced(future):
+    """Wait for a coalesced catt command and return its output."""
+    try:
+        return future.result(timeout=COALESCED_COMMAND_TIMEOUT)
+    except Exception:
+        return "", "Timeout", 1
+
 def parse_catt_info(output):
     """Parse catt info output into a dict."""
     info = {
@@ -255,10 +385,45 @@ def parse_catt_info(output):
 
     return info
 
+# Rendered index page: (body, {encoding: bytes}, etag), built on first request
+_index_cache = None
+
+def encoded_response(body, variants, mimetype):
+    """Build a response using the best precompressed variant the client accepts."""
+    encoding = choose_encoding(request.accept_encodings, variants)
+    response = make_response(variants[encoding] if encoding else body)
+    response.mimetype = mimetype
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
 @app.route('/')
 def index():
-    """Serve the main UI."""
-    return render_template('index.html')
+    """Serve the main UI (rendered once, revalidated via ETag)."""
+    global _index_cache
+    if _index_cache is None:
+        body = render_template('index.html').encode("utf-8")
+        _index_cache = (body, compress(body), content_etag(body))
+
+    body, variants, etag = _index_cache
+    if request.if_none_match.contains(etag):
+        response = make_response("", 304)
+    else:
+        response = encoded_response(body, variants, "text/html")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+@app.route('/assets/<filename>')
+def serve_asset(filename):
+    """Serve a fingerprinted asset with immutable cache headers."""
+    asset = asset_pipeline.by_fingerprint.get(filename)
+    if asset is None:
+        return jsonify({"success": False, "message": "Asset not found"}), 404
+    response = encoded_response(asset.body, asset.variants, asset.mimetype)
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE
+    return response
 
 @app.route('/audio/<filename>')
 def serve_audio(filename):
@@ -304,6 +469,7 @@ def pause():
 def stop():
     """Stop playback."""
     global current_source
+    play_queue.stop()
     stdout, stderr, code = run_catt("stop")
     current_source = {"type": None, "name": None}
     return jsonify({"success": code == 0, "message": stderr if code != 0 else "Stopped"})
@@ -312,25 +478,29 @@ def stop():
 def set_volume(level):
     """Set volume (0-100)."""
     level = max(0, min(100, level))
-    stdout, stderr, code = run_catt("volume", str(level))
+    stdout, stderr, code = run_coalesced(
+        catt_coalescer.submit_set(DEVICE, "volume", "volume", level))
     return jsonify({"success": code == 0, "volume": level})
 
 @app.route('/api/volumeup', methods=['POST'])
 def volume_up():
     """Increase volume by 10."""
-    stdout, stderr, code = run_catt("volumeup", "10")
+    stdout, stderr, code = run_coalesced(
+        catt_coalescer.submit_delta(DEVICE, "volume", 10, "volumeup", "volumedown", set_command="volume"))
     return jsonify({"success": code == 0})
 
 @app.route('/api/volumedown', methods=['POST'])
 def volume_down():
     """Decrease volume by 10."""
-    stdout, stderr, code = run_catt("volumedown", "10")
+    stdout, stderr, code = run_coalesced(
+        catt_coalescer.submit_delta(DEVICE, "volume", -10, "volumeup", "volumedown", set_command="volume"))
     return jsonify({"success": code == 0})
 
 @app.route('/api/seek/<time>', methods=['POST'])
 def seek(time):
     """Seek to position."""
-    stdout, stderr, code = run_catt("seek", time)
+    stdout, stderr, code = run_coalesced(
+        catt_coalescer.submit_set(DEVICE, "seek", "seek", time))
     return jsonify({"success": code == 0})
 
 @app.route('/api/skip', methods=['POST'])
@@ -351,6 +521,7 @@ def play_radio(station):
     if station not in RADIO_STATIONS:
         return jsonify({"success": False, "message": "Station not found"}), 404
 
+    play_queue.stop()
     run_catt("stop")
     time.sleep(1)
 
@@ -375,6 +546,7 @@ def play_youtube(name):
     if name not in YOUTUBE_FAVORITES:
         return jsonify({"success": False, "message": f"Video '{name}' not found"}), 404
 
+    play_queue.stop()
     run_catt("stop")
     time.sleep(1)
 
@@ -386,37 +558,241 @@ def play_youtube(name):
 
     return jsonify({"success": code == 0, "name": name, "message": stderr if code != 0 else f"Playing {name}"})
 
-# ==================== SHODH Memory Functions ====================
+# ==================== Play Queue ====================
+
+def resolve_queue_item(item):
+    """Prepare a queue item for casting and return the URL to cast.
+
+    Runs ahead of time on the prefetch pool: follows radio redirects,
+    resolves YouTube to a direct media URL (if yt_dlp is importable) and
+    renders TTS clips.
+    """
+    if item.type == "tts":
+        filename, filepath = text_to_speech(item.source)
+        return f"http://{LOCAL_IP}:{LOCAL_PORT}/audio/{filename}"
+
+    if item.type == "radio":
+        import requests
+        try:
+            response = requests.head(item.source, allow_redirects=True, timeout=3)
+            if response.status_code < 400:
+                return response.url
+        except Exception as e:
+            print(f"Queue: redirect lookup failed for {item.name}: {e}")
+        return item.source
+
+    if item.type == "youtube":
+        try:
+            import yt_dlp
+        except ImportError:
+            return item.source  # catt resolves it at cast time
+        try:
+            with yt_dlp.YoutubeDL({"quiet": True, "format": "best[ext=mp4]/best"}) as ydl:
+                info = ydl.extract_info(item.source, download=False)
+            return info.get("url") or item.source
+        except Exception as e:
+            print(f"Queue: YouTube resolve failed for {item.name}: {e}")
+            return item.source
+
+    return item.source
+
+def cast_queue_url(url):
+    """Cast a prepared queue URL (no stop/sleep: it replaces the finished item)."""
+    stdout, stderr, code = run_catt("cast", url)
+    return code == 0, stderr
+
+def queue_device_status():
+    """Parsed device info for the queue monitor, None if nothing is playing."""
+    stdout, stderr, code = run_catt("info")
+    if code != 0:
+        return None
+    return parse_catt_info(stdout)
 
-def shodh_recall(query, limit=3):
-    """Search for relevant memories using semantic search."""
-    if not SHODH_API_KEY:
+def on_queue_item_started(item):
+    global current_source
+    current_source = {"type": item.type, "name": item.name}
+
+play_queue = PlayQueue(DEVICE, resolve_queue_item, cast_queue_url,
+                       queue_device_status, on_start=on_queue_item_started)
+
+def make_queue_item(data):
+    """Build a QueueItem from request data: (item, error_message, status)."""
+    item_type = data.get('type', '')
+    name = data.get('name', '')
+
+    if item_type == "radio":
+        if name not in RADIO_STATIONS:
+            return None, "Station not found", 404
+        return QueueItem("radio", name, RADIO_STATIONS[name]), None, 200
+    if item_type == "youtube":
+        if name not in YOUTUBE_FAVORITES:
+            return None, f"Video '{name}' not found", 404
+        return QueueItem("youtube", name, YOUTUBE_FAVORITES[name]), None, 200
+    if item_type == "tts":
+        text = data.get('text', '')
+        if not text:
+            return None, "No text provided", 400
+        return QueueItem("tts", name or text[:40], text), None, 200
+    return None, f"Unknown type '{item_type}'", 400
+
+@app.route('/api/queue')
+def get_queue():
+    """Get the play queue."""
+    return jsonify(play_queue.snapshot())
+
+@app.route('/api/queue/add', methods=['POST'])
+def queue_add():
+    """
+    Add an item to the play queue.
+    Body: {"type": "radio"|"youtube", "name": "..."} or {"type": "tts", "text": "..."}
+    Optional "play": true starts the queue if it is not running.
+    """
+    data = request.get_json() or {}
+    item, error, status = make_queue_item(data)
+    if error:
+        return jsonify({"success": False, "message": error}), status
+
+    play_queue.enqueue(item)
+    if data.get('play'):
+        play_queue.play()
+    return jsonify({"success": True, "item": item.to_dict(), "queue": play_queue.snapshot()})
+
+@app.route('/api/queue/remove/<int:item_id>', methods=['POST'])
+def queue_remove(item_id):
+    """Remove an item from the play queue."""
+    removed = play_queue.remove(item_id)
+    return jsonify({"success": removed, "queue": play_queue.snapshot()}), 200 if removed else 404
+
+@app.route('/api/queue/play', methods=['POST'])
+def queue_play():
+    """Start playing the queue."""
+    started = play_queue.play()
+    return jsonify({"success": started, "queue": play_queue.snapshot()})
+
+@app.route('/api/queue/next', methods=['POST'])
+def queue_next():
+    """Skip to the next queue item."""
+    return jsonify({"success": play_queue.next(), "queue": play_queue.snapshot()})
+
+@app.route('/api/queue/stop', methods=['POST'])
+def queue_stop():
+    """Stop advancing the queue (keeps the remaining items)."""
+    play_queue.stop()
+    return jsonify({"success": True, "queue": play_queue.snapshot()})
+
+@app.route('/api/queue/clear', methods=['POST'])
+def queue_clear():
+    """Remove all queued items."""
+    play_queue.clear()
+    return jsonify({"success": True, "queue": play_queue.snapshot()})
+
+# ==================== Scheduler ====================
+
+def prepare_scheduled(action):
+    """Pre-warm a scheduled action: resolve/render it and touch the device."""
+    item, error, status = make_queue_item(action)
+    if error:
+        raise ValueError(error)
+    url = resolve_queue_item(item)
+    # catt keeps no connection open; an info call wakes device and network path
+    run_catt("info")
+    return url
+
+def execute_scheduled(action, prepared_url):
+    """Start a scheduled action on the device."""
+    global current_source
+    item, error, status = make_queue_item(action)
+    if error:
+        raise ValueError(error)
+    url = prepared_url or resolve_queue_item(item)
+    play_queue.stop()
+    # No stop/sleep: the cast replaces whatever is playing
+    stdout, stderr, code = run_catt("cast", url)
+    if code != 0:
+        raise RuntimeError(stderr or "cast failed")
+    current_source = {"type": item.type, "name": item.name}
+
+scheduler = Scheduler(
+    state_file("GHOME_SCHEDULE_FILE", SCHEDULE_FILE),
+    prepare_scheduled, execute_scheduled, prewarm=SCHEDULER_PREWARM_SECONDS
+)
+
+@app.route('/api/schedule')
+def get_schedule():
+    """List scheduled jobs."""
+    return jsonify({"jobs": scheduler.snapshot()})
+
+@app.route('/api/schedule/add', methods=['POST'])
+def schedule_add():
+    """
+    Schedule playback or an announcement.
+    Body: the same item fields as /api/queue/add plus either
+    "time": "HH:MM" (next occurrence, "repeat": "daily" to repeat) or
+    "at": "YYYY-MM-DDTHH:MM[:SS]" (local time).
+    """
+    data = request.get_json() or {}
+    item, error, status = make_queue_item(data)
+    if error:
+        return jsonify({"success": False, "message": error}), status
+
+    for field in ('time', 'at'):
+        if data.get(field) and not isinstance(data[field], str):
+            return jsonify({"success": False, "message": f"'{field}' must be a string"}), 400
+
+    action = {k: data[k] for k in ("type", "name", "text") if k in data}
+    repeat = REPEAT_DAILY if data.get('repeat') == REPEAT_DAILY else None
+    try:
+        if data.get('time'):
+            job = scheduler.add(action, time_of_day=data['time'], repeat=repeat, label=item.name)
+        elif data.get('at'):
+            due = datetime.fromisoformat(data['at']).timestamp()
+            if due <= time.time():
+                return jsonify({"success": False, "message": "Time is in the past"}), 400
+            job = scheduler.add(action, due=due, repeat=repeat, label=item.name)
+        else:
+            return jsonify({"success": False, "message": "Provide 'time' or 'at'"}), 400
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    return jsonify({"success": True, "job": job})
+
+@app.route('/api/schedule/remove/<job_id>', methods=['POST'])
+def schedule_remove(job_id):
+    """Remove a scheduled job."""
+    removed = scheduler.remove(job_id)
+    return jsonify({"success": removed}), 200 if removed else 404
+
+def start_background_services(port):
+    """Start everything that must run once per serving process.
+
+    Not done at import: with debug=True the reloader parent imports this
+    module too, and the scheduler must not fire jobs twice.
+    """
+    load_history()
+    scheduler.load()
+    scheduler.start()
+    start_background_warmup(port)
+
+# ==================== Memory Functions ====================
+
+memory_backend = create_memory_backend(
+    MEMORY_BACKEND,
+    shodh_url=SHODH_URL,
+    shodh_api_key=SHODH_API_KEY,
+    local_path=state_file("GHOME_MEMORY_FILE", LOCAL_MEMORY_FILE),
+)
+
+def memory_recall(query, limit=3):
+    """Search the configured memory backend for relevant memories."""
+    if not memory_backend.enabled:
         return []
     try:
-        response = requests.post(
-            f"{SHODH_URL}/api/recall",
-            headers={
-                "Authorization": f"Bearer {SHODH_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={"query": query, "limit": limit},
-            timeout=5
-        )
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("memories", [])
+        return memory_backend.recall(query, limit=limit)
     except Exception as e:
-        print(f"SHODH recall error: {e}")
-    return []
+        print(f"Memory recall error: {e}")
+        return []
 
-def reformulate_for_storage(content):
-    """Use LLM to reformulate user input into factual third-person statement."""
-    if not groq_client:
-        return content
-    try:
-        result = groq_client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": """Formuliere den folgenden Text als faktische Aussage in der dritten Person um.
+REFORMULATE_PROMPT = """Formuliere den folgenden Text als faktische Aussage in der dritten Person um.
 Regeln:
 - Keine Ich-Form, sondern "Der Benutzer..." oder direkte Fakten
 - Kurz und prägnant (1 Satz)
@@ -427,10 +803,20 @@ Beispiele:
 "mein Name ist Henry" → "Der Benutzer heisst Henry."
 "ich mag Pizza" → "Der Benutzer mag Pizza."
 "dass ich in Zürich wohne" → "Der Benutzer wohnt in Zürich."
-"Meeting morgen um 10" → "Meeting ist morgen um 10 Uhr geplant.\""""},
+"Meeting morgen um 10" → "Meeting ist morgen um 10 Uhr geplant.\""""
+
+def reformulate_for_storage(content):
+    """Use LLM to reformulate user input into factual third-person statement."""
+    groq_client = get_groq_client()
+    if not groq_client:
+        return content
+    try:
+        result = groq_client.chat.completions.create(
+            messages=[
+                {"role": "system", "content": REFORMULATE_PROMPT},
                 {"role": "user", "content": content}
             ],
-            model="llama-3.3-70b-versatile",
+            model=CHAT_MODEL,
             temperature=0.3,
             max_tokens=100,
         )
@@ -438,9 +824,9 @@ Beispiele:
     except:
         return content  # Fallback to original if LLM fails
 
-def shodh_remember(content, memory_type="Conversation", tags=None, reformulate=False):
-    """Store a new memory in SHODH."""
-    if not SHODH_API_KEY:
+def memory_remember(content, memory_type="Conversation", tags=None, reformulate=False):
+    """Store a new memory in the configured backend."""
+    if not memory_backend.enabled:
         return None
 
     # Reformulate if requested (for user-provided explicit memories)
@@ -448,52 +834,10 @@ def shodh_remember(content, memory_type="Conversation", tags=None, reformulate=F
         content = reformulate_for_storage(content)
 
     try:
-        payload = {
-            "content": content,
-            "type": memory_type,
-            "source_type": "ai_generated"
-        }
-        if tags:
-            payload["tags"] = tags
-
-        response = requests.post(
-            f"{SHODH_URL}/api/remember",
-            headers={
-                "Authorization": f"Bearer {SHODH_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json=payload,
-            timeout=5
-        )
-        if response.status_code == 200:
-            return response.json()
-    except Exception as e:
-        print(f"SHODH remember error: {e}")
-    return None
-
-def shodh_context(context, max_results=3, auto_ingest=True):
-    """Surface relevant memories based on context."""
-    if not SHODH_API_KEY:
-        return {"surfaced_memories": [], "count": 0}
-    try:
-        response = requests.post(
-            f"{SHODH_URL}/api/context",
-            headers={
-                "Authorization": f"Bearer {SHODH_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "context": context,
-                "max_results": max_results,
-                "auto_ingest": auto_ingest
-            },
-            timeout=5
-        )
-        if response.status_code == 200:
-            return response.json()
+        return memory_backend.remember(content, memory_type=memory_type, tags=tags)
     except Exception as e:
-        print(f"SHODH context error: {e}")
-    return {"surfaced_memories": [], "count": 0}
+        print(f"Memory remember error: {e}")
+        return None
 
 def format_memories_for_context(memories, max_chars=500):
     """Format memories for inclusion in LLM context."""
@@ -521,24 +865,73 @@ def format_memories_for_context(memories, max_chars=500):
 
 # ==================== Voice Assistant (Groq + Gemini + Edge TTS) ====================
 
-def get_gemini_response(messages, system_content):
-    """Get response from Gemini as fallback."""
-    if not gemini_model:
-        raise Exception("Gemini nicht konfiguriert (GEMINI_API_KEY fehlt)")
+def summarize_history(previous_summary, turns, max_tokens):
+    """Merge evicted conversation turns into the rolling summary (runs in background)."""
+    transcript = "\n".join(
+        f"Benutzer: {t['user']}\nLeni: {t['assistant']}" for t in turns
+    )
+    instruction = (
+        f"Fasse das bisherige Gespräch in höchstens {int(max_tokens * 0.6)} Wörtern zusammen. "
+        "Behalte Fakten, Namen, Termine und offene Fragen. Nur die Zusammenfassung ausgeben."
+    )
+    content = f"Bisherige Zusammenfassung:\n{previous_summary or '-'}\n\nNeue Gesprächsteile:\n{transcript}"
 
-    # Convert messages to Gemini format (combine into single prompt)
-    prompt_parts = [system_content + "\n\n"]
-    for msg in messages:
-        if msg["role"] == "user":
-            prompt_parts.append(f"User: {msg['content']}\n")
-        elif msg["role"] == "assistant":
-            prompt_parts.append(f"Assistant: {msg['content']}\n")
-    prompt_parts.append("Assistant: ")
+    groq_client = get_groq_client()
+    if groq_client:
+        result = groq_client.chat.completions.create(
+            messages=[
+                {"role": "system", "content": instruction},
+                {"role": "user", "content": content}
+            ],
+            model=SUMMARY_MODEL,
+            temperature=0.2,
+            max_tokens=max_tokens,
+        )
+        return result.choices[0].message.content
+    gemini_model = get_gemini_model()
+    if gemini_model:
+        return gemini_model.generate_content(f"{instruction}\n\n{content}").text
+    return None
 
-    full_prompt = "".join(prompt_parts)
+prompt_builder = PromptBuilder(ASSISTANT_PERSONA, PROMPT_TOKEN_BUDGET, MAX_HISTORY)
+
+# Conversation turns and summaries survive restarts in an append-only log
+history_log = HistoryLog(
+    state_file("GHOME_HISTORY_FILE", HISTORY_FILE),
+    keep=MAX_HISTORY,
+    fsync_interval=HISTORY_FSYNC_INTERVAL,
+    compact_records=HISTORY_COMPACT_RECORDS,
+)
+history_summarizer = HistorySummarizer(
+    summarize_history, HISTORY_SUMMARY_TOKENS, on_update=history_log.record_summary
+)
+
+def load_history():
+    """Restore conversation history and summary from the history log."""
+    global conversation_history
+    recent, summary, pending = history_log.load()
+    conversation_history = recent
+    history_summarizer.reset(summary)
+    # Turns evicted before the last summary was written (e.g. crash mid-summary)
+    history_summarizer.submit(pending)
+    if recent or summary:
+        print(f"History: restored {len(recent)} turns"
+              f"{' + summary' if summary else ''}"
+              f"{f', summarizing {len(pending)} more' if pending else ''}")
+
+def get_gemini_response(messages):
+    """Get response from Gemini as fallback.
+
+    messages come from prompt_builder; the persona is already the model's
+    system instruction.
+    """
+    gemini_model = get_gemini_model()
+    if not gemini_model:
+        raise Exception("Gemini nicht konfiguriert (GEMINI_API_KEY fehlt)")
+    import google.generativeai as genai
 
     response = gemini_model.generate_content(
-        full_prompt,
+        to_gemini_contents(messages),
         generation_config=genai.types.GenerationConfig(
             temperature=0.7,
             max_output_tokens=200,
@@ -546,51 +939,96 @@ def get_gemini_response(messages, system_content):
     )
     return response.text
 
-def get_llm_response(text, use_memory=True):
-    """Get response from LLM with Gemini fallback on Groq rate limit."""
-    global conversation_history, last_llm_used
-
-    if not groq_client and not gemini_model:
-        return "Fehler: Weder GROQ_API_KEY noch GEMINI_API_KEY gesetzt.", 0, None
+def plan_llm_request(text, use_memory=True):
+    """Decide memory handling for a request (no I/O).
 
+    Shared by the WSGI views and the async path in asgi.py.
+    """
     # Check if this is an explicit memory store request
     do_store, store_reason = should_store_memory(text)
     do_recall, recall_reason = should_recall_memory(text)
 
-    # Build system message with persona and memory context
-    system_content = ASSISTANT_PERSONA
+    # Explicit "Merke dir" requests get a pre-synthesized confirmation, no LLM call
+    will_store = bool(use_memory and memory_backend.enabled and do_store)
+    canned_response = None
+    if will_store and store_reason == "explicit" and MEMORY_CONFIRMATION_PHRASES:
+        canned_response = random.choice(MEMORY_CONFIRMATION_PHRASES)
+
+    # Per-request context (the persona prefix stays untouched for prefix caching)
+    context = []
 
     # Handle explicit memory triggers
     if store_reason == "explicit":
-        memory_content = extract_memory_content(text)
-        system_content += "\n\nDer Benutzer möchte, dass du dir etwas merkst. Bestätige kurz und professionell."
+        context.append("Der Benutzer möchte, dass du dir etwas merkst. Bestätige kurz und professionell.")
+
+    return {
+        "will_store": will_store,
+        "store_reason": store_reason,
+        "canned_response": canned_response,
+        "recall": bool(use_memory and memory_backend.enabled and do_recall and canned_response is None),
+        "context": context,
+    }
 
-    memory_count = 0
-    if use_memory and SHODH_API_KEY and do_recall:
+def build_llm_messages(text, plan, memories):
+    """Persona, rolling summary, recent history and context within the token budget."""
+    context = list(plan["context"])
+    if plan["recall"]:
+        context.append(format_memories_for_context(memories))
+    return prompt_builder.build(text, conversation_history, history_summarizer.summary, context)
+
+def record_llm_turn(text, response):
+    """Store an exchange in the history, summarize evicted turns in the background."""
+    global conversation_history
+    conversation_history.append(history_log.append_turn(text, response))
+    if len(conversation_history) > MAX_HISTORY:
+        history_summarizer.submit(conversation_history[:-MAX_HISTORY])
+        conversation_history = conversation_history[-MAX_HISTORY:]
+
+def memory_to_store(text, response, plan):
+    """Return (content, memory_remember kwargs) for this exchange, or None."""
+    if not plan["will_store"]:
+        return None
+    if plan["store_reason"] == "explicit":
+        return extract_memory_content(text), {
+            "memory_type": "Learning",
+            "tags": ["ghome-assistant", "explicit", "user-info"],
+            "reformulate": True
+        }
+    return f"Frage: {text}\nAntwort: {response}", {
+        "memory_type": "Conversation",
+        "tags": ["ghome-assistant", "voice"]
+    }
+
+def get_llm_response(text, use_memory=True):
+    """Get response from LLM with Gemini fallback on Groq rate limit."""
+    global last_llm_used
+
+    groq_client = get_groq_client()
+    gemini_model = get_gemini_model()
+    if not groq_client and not gemini_model:
+        return "Fehler: Weder GROQ_API_KEY noch GEMINI_API_KEY gesetzt.", 0, None
+
+    plan = plan_llm_request(text, use_memory)
+    canned_response = plan["canned_response"]
+
+    memories = []
+    if plan["recall"]:
         # Recall relevant memories
-        memories = shodh_recall(text, limit=3)
-        memory_count = len(memories)
-        memory_context = format_memories_for_context(memories)
-        if memory_context:
-            system_content += f"\n\n{memory_context}"
-
-    # Build messages with conversation history
-    messages = []
-    for exchange in conversation_history[-MAX_HISTORY:]:
-        messages.append({"role": "user", "content": exchange["user"]})
-        messages.append({"role": "assistant", "content": exchange["assistant"]})
-    messages.append({"role": "user", "content": text})
-
-    response = None
+        memories = memory_recall(text, limit=3)
+    memory_count = len(memories)
+
+    messages, prompt_tokens = build_llm_messages(text, plan, memories)
+
+    response = canned_response
     groq_error = None
 
     # Try Groq first
-    if groq_client:
+    if response is None and groq_client:
+        from groq import RateLimitError, APIStatusError
         try:
-            groq_messages = [{"role": "system", "content": system_content}] + messages
             chat_completion = groq_client.chat.completions.create(
-                messages=groq_messages,
-                model="llama-3.3-70b-versatile",
+                messages=messages,
+                model=CHAT_MODEL,
                 temperature=0.7,
                 max_tokens=200,
             )
@@ -606,7 +1044,7 @@ def get_llm_response(text, use_memory=True):
     # Fallback to Gemini if Groq failed or unavailable
     if response is None and gemini_model:
         try:
-            response = get_gemini_response(messages, system_content)
+            response = get_gemini_response(messages)
             last_llm_used = "gemini"
             if groq_error:
                 print(f"Gemini fallback successful after Groq error")
@@ -617,36 +1055,28 @@ def get_llm_response(text, use_memory=True):
             raise Exception(format_api_error(e))
 
     if response is None:
-        raise Exception("Kein LLM verfügbar")
+        raise Exception(groq_error or "Kein LLM verfügbar")
 
-    # Store in conversation history
-    conversation_history.append({"user": text, "assistant": response})
-    if len(conversation_history) > MAX_HISTORY:
-        conversation_history = conversation_history[-MAX_HISTORY:]
+    record_llm_turn(text, response)
 
-    # Store in SHODH memory based on trigger patterns
+    # Store in memory based on trigger patterns
     memory_stored = False
-    if use_memory and SHODH_API_KEY and do_store:
+    store = memory_to_store(text, response, plan)
+    if store:
+        memory_content, store_kwargs = store
         try:
-            if store_reason == "explicit":
-                memory_content = extract_memory_content(text)
-                shodh_remember(
-                    memory_content,
-                    memory_type="Learning",
-                    tags=["ghome-assistant", "explicit", "user-info"],
-                    reformulate=True
-                )
+            if canned_response:
+                # Confirmation is already spoken; reformulate and store in background
+                threading.Thread(target=memory_remember, args=(memory_content,),
+                                 kwargs=store_kwargs, daemon=True).start()
+                memory_stored = "pending"
             else:
-                shodh_remember(
-                    f"Frage: {text}\nAntwort: {response}",
-                    memory_type="Conversation",
-                    tags=["ghome-assistant", "voice"]
-                )
-            memory_stored = True
+                memory_remember(memory_content, **store_kwargs)
+                memory_stored = True
         except:
             pass
 
-    return response, memory_count, {"stored": memory_stored, "reason": store_reason}
+    return response, memory_count, {"stored": memory_stored, "reason": plan["store_reason"], "prompt_tokens": prompt_tokens}
 
 # Keep old function name for compatibility
 def get_groq_response(text, use_memory=True):
@@ -655,11 +1085,38 @@ def get_groq_response(text, use_memory=True):
 
 async def generate_tts_audio(text, output_file):
     """Generate TTS audio using Edge TTS."""
+    import edge_tts
     communicate = edge_tts.Communicate(text, TTS_VOICE)
     await communicate.save(output_file)
 
+def synthesize_to_file(text, filepath):
+    """Render text to an audio file (blocking)."""
+    asyncio.run(generate_tts_audio(text, filepath))
+
+# Canned replies rendered ahead of time (see config.py)
+phrase_bank = PhraseBank(
+    MEMORY_CONFIRMATION_PHRASES + list(ERROR_PHRASES.values()) + COMMON_PHRASES,
+    TTS_VOICE, AUDIO_DIR, synthesize_to_file
+)
+
+def spoken_error(message):
+    """Return the pre-rendered audio filename for an error message, or None.
+
+    Messages from format_api_error() are matched by their prefix, so
+    variants with wait times still map to the rendered category phrase.
+    """
+    for prefix, phrase in ERROR_PHRASES.items():
+        if message.startswith(prefix):
+            return phrase_bank.lookup(phrase)
+    return phrase_bank.lookup(ERROR_PHRASES["Fehler"])
+
 def text_to_speech(text):
     """Convert text to speech and return audio file path."""
+    # Pre-rendered phrase: no TTS round trip
+    cached = phrase_bank.lookup(text)
+    if cached:
+        return cached, os.path.join(AUDIO_DIR, cached)
+
     filename = f"assistant_{uuid.uuid4().hex[:8]}.mp3"
     filepath = os.path.join(AUDIO_DIR, filename)
     
@@ -668,9 +1125,73 @@ def text_to_speech(text):
     
     return filename, filepath
 
+# Assistant requests share a bounded lane; control endpoints bypass it
+assistant_limiter = AdmissionLimiter(
+    ASSISTANT_MAX_CONCURRENT, ASSISTANT_MAX_WAITING, ASSISTANT_WAIT_TIMEOUT
+)
+
+def saturated_payload(retry_after):
+    """JSON body of a 503 from the assistant lane."""
+    return {
+        "success": False,
+        "error": f"Assistent ausgelastet. Bitte in {retry_after}s nochmal versuchen.",
+        "retry_after": retry_after
+    }
+
+def admission_controlled(view):
+    """Run an assistant view in the limited lane; 503 + Retry-After when full."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            with assistant_limiter.slot():
+                return view(*args, **kwargs)
+        except Saturated as e:
+            response = jsonify(saturated_payload(e.retry_after))
+            response.status_code = 503
+            response.headers["Retry-After"] = str(e.retry_after)
+            return response
+    return wrapper
+
+# Identical utterances from the same client share one LLM + TTS + cast run;
+# only successful results are reused after the original finished
+# ($GHOME_DEDUP_WINDOW overrides the window, the load test sets it to 0)
+assistant_dedup = InflightDeduplicator(
+    float(os.environ.get("GHOME_DEDUP_WINDOW") or ASSISTANT_DEDUP_WINDOW),
+    keep=lambda result: result[1] == 200
+)
+
+def deduplicated(view):
+    """Attach a repeated assistant request to the identical one in flight.
+
+    Keyed by (client, normalized text, endpoint, use_memory). Applied
+    outside admission_controlled so duplicates never take a slot.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        data = request.get_json(silent=True) or {}
+        text = normalize_text(str(data.get('text', '')))
+        if not text:
+            return view(*args, **kwargs)
+        client = request.headers.get("X-Forwarded-For", request.remote_addr or "")
+        key = (client.split(",")[0].strip(), text, request.endpoint, bool(data.get('use_memory', True)))
+
+        def compute():
+            # Snapshot body/status/headers: a Response object must not be shared
+            response = app.make_response(view(*args, **kwargs))
+            return response.get_data(), response.status_code, list(response.headers)
+
+        (body, status, headers), shared = assistant_dedup.run(key, compute)
+        response = app.response_class(body, status=status, headers=headers)
+        if shared:
+            response.headers["X-Deduplicated"] = "1"
+        return response
+    return wrapper
+
 @app.route('/api/assistant/health')
 def assistant_health():
     """Check if Voice Assistant is available."""
+    groq_client = get_groq_client()
+    gemini_model = get_gemini_model()
     if not groq_client and not gemini_model:
         return jsonify({"api_available": False, "error": "Weder GROQ_API_KEY noch GEMINI_API_KEY gesetzt"})
 
@@ -680,10 +1201,11 @@ def assistant_health():
 
     # Test Groq connection
     if groq_client:
+        from groq import RateLimitError
         try:
             test = groq_client.chat.completions.create(
                 messages=[{"role": "user", "content": "test"}],
-                model="llama-3.3-70b-versatile",
+                model=CHAT_MODEL,
                 max_tokens=5,
             )
             groq_available = True
@@ -702,22 +1224,13 @@ def assistant_health():
         except:
             pass
 
-    # Check SHODH memory status
+    # Check memory backend status
     memory_available = False
     memory_count = 0
-    if SHODH_API_KEY:
-        try:
-            response = requests.get(
-                f"{SHODH_URL}/api/stats",
-                headers={"Authorization": f"Bearer {SHODH_API_KEY}"},
-                timeout=3
-            )
-            if response.status_code == 200:
-                stats = response.json()
-                memory_available = True
-                memory_count = stats.get("total_memories", 0)
-        except:
-            pass
+    stats = memory_backend.stats() if memory_backend.enabled else None
+    if stats is not None:
+        memory_available = True
+        memory_count = stats.get("total_memories", 0)
 
     return jsonify({
         "api_available": groq_available or gemini_available,
@@ -728,10 +1241,15 @@ def assistant_health():
         "tts": "Edge TTS",
         "voice": TTS_VOICE,
         "memory_available": memory_available,
-        "memory_count": memory_count
+        "memory_count": memory_count,
+        "memory_backend": memory_backend.name,
+        "admission": assistant_limiter.stats(),
+        "dedup": assistant_dedup.stats()
     })
 
 @app.route('/api/assistant/chat', methods=['POST'])
+@deduplicated
+@admission_controlled
 def assistant_chat():
     """
     Chat with voice output to Google Home.
@@ -755,7 +1273,8 @@ def assistant_chat():
         # Build audio URL
         audio_url = f"http://{LOCAL_IP}:{LOCAL_PORT}/audio/{filename}"
 
-        # Stop current playback
+        # Stop current playback (and queue auto-advance)
+        play_queue.stop()
         run_catt("stop")
         time.sleep(0.5)
 
@@ -776,9 +1295,25 @@ def assistant_chat():
         })
 
     except Exception as e:
-        return jsonify({"success": False, "error": format_api_error(e)}), 500
+        error = format_api_error(e)
+
+        # Speak the error on Google Home using the pre-rendered phrase
+        error_audio = spoken_error(error)
+        response = {"success": False, "error": error}
+        if error_audio:
+            audio_url = f"http://{LOCAL_IP}:{LOCAL_PORT}/audio/{error_audio}"
+            play_queue.stop()
+            run_catt("stop")
+            time.sleep(0.5)
+            stdout, stderr, code = run_catt("cast", audio_url)
+            if code == 0:
+                current_source = {"type": "assistant", "name": "Voice Assistant"}
+                response["audio_url"] = audio_url
+        return jsonify(response), 500
 
 @app.route('/api/assistant/chat/text', methods=['POST'])
+@deduplicated
+@admission_controlled
 def assistant_chat_text():
     """
     Chat with text response only (no audio).
@@ -803,6 +1338,8 @@ def assistant_chat_text():
         return jsonify({"success": False, "error": format_api_error(e)}), 500
 
 @app.route('/api/assistant/chat/browser', methods=['POST'])
+@deduplicated
+@admission_controlled
 def assistant_chat_browser():
     """
     Chat with audio response for browser playback.
@@ -836,7 +1373,15 @@ def assistant_chat_browser():
         })
 
     except Exception as e:
-        return jsonify({"success": False, "error": format_api_error(e)}), 500
+        error = format_api_error(e)
+        error_audio = spoken_error(error)
+        response = {"success": False, "error": error}
+        if error_audio:
+            response["audio_url"] = f"/audio/{error_audio}"
+        return jsonify(response), 500
 
 if __name__ == '__main__':
+    # With debug=True the reloader parent only watches files; start services in the serving child
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_background_services(5000)
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,495 @@
+"""Google Home Web Controller - ASGI entry point
+
+Serves the assistant chat endpoints natively on asyncio: Groq through
+AsyncGroq, Gemini and SHODH over httpx, edge_tts awaited directly and catt
+run as asyncio subprocesses. A request waiting for the LLM, TTS or the
+device holds no thread, so one process can keep dozens of assistant
+requests in flight.
+
+All other routes (UI, playback, queue, scheduler, audio files, health) are
+the unchanged Flask app, called on a thread pool with buffered responses.
+Admission control, deduplication, history and memory rules are shared with
+the Flask views.
+
+    pip install uvicorn
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+`python app.py` keeps serving everything synchronously.
+"""
+
+import asyncio
+import io
+import json
+import os
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import app as core
+from admission import Saturated
+from prompt_builder import to_gemini_contents
+from request_dedup import normalize_text
+
+# Seconds a catt command may take (same as app.run_catt)
+CATT_TIMEOUT = 10
+
+# Timeout for LLM calls over httpx (seconds)
+LLM_TIMEOUT = 30
+
+GEMINI_DEFAULT_ENDPOINT = "https://generativelanguage.googleapis.com"
+
+# Threads for the Flask routes (control, info polling, audio files)
+WSGI_WORKERS = 32
+
+# ==================== Async Providers ====================
+
+_async_groq_client = None
+_http_client = None
+_background_tasks = set()
+
+
+def get_async_groq_client():
+    """Return the AsyncGroq client, creating it on first use (None if no API key)."""
+    global _async_groq_client
+    if _async_groq_client is None and core.GROQ_API_KEY:
+        from groq import AsyncGroq
+        _async_groq_client = AsyncGroq(api_key=core.GROQ_API_KEY)
+    return _async_groq_client
+
+
+def get_http_client():
+    """Shared httpx.AsyncClient for Gemini REST calls."""
+    global _http_client
+    if _http_client is None:
+        import httpx
+        _http_client = httpx.AsyncClient(timeout=LLM_TIMEOUT)
+    return _http_client
+
+
+def spawn(coro):
+    """Run a coroutine in the background, keeping a reference until it is done."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def get_gemini_response_async(messages):
+    """Gemini fallback over the REST API (the SDK's async path needs gRPC)."""
+    if not core.GEMINI_API_KEY:
+        raise Exception("Gemini nicht konfiguriert (GEMINI_API_KEY fehlt)")
+    import httpx
+
+    base = core.GEMINI_API_ENDPOINT or GEMINI_DEFAULT_ENDPOINT
+    if "://" not in base:
+        base = f"https://{base}"
+    contents = [
+        {"role": content["role"], "parts": [{"text": part} for part in content["parts"]]}
+        for content in to_gemini_contents(messages)
+    ]
+    try:
+        response = await get_http_client().post(
+            f"{base}/v1beta/models/{core.GEMINI_MODEL}:generateContent",
+            headers={"x-goog-api-key": core.GEMINI_API_KEY},
+            json={
+                "systemInstruction": {"parts": [{"text": core.ASSISTANT_PERSONA}]},
+                "contents": contents,
+                "generationConfig": {"temperature": 0.7, "maxOutputTokens": 200},
+            },
+        )
+    except httpx.TimeoutException:
+        raise Exception("Zeitüberschreitung bei der Anfrage. Bitte nochmal versuchen.")
+    response.raise_for_status()
+    parts = response.json()["candidates"][0]["content"]["parts"]
+    return "".join(part.get("text", "") for part in parts)
+
+
+# ==================== Async Memory ====================
+
+async def memory_recall_async(query, limit=3):
+    if not core.memory_backend.enabled:
+        return []
+    try:
+        return await core.memory_backend.recall_async(query, limit=limit)
+    except Exception as e:
+        print(f"Memory recall error: {e}")
+        return []
+
+
+async def reformulate_for_storage_async(content):
+    groq_client = get_async_groq_client()
+    if not groq_client:
+        return content
+    try:
+        result = await groq_client.chat.completions.create(
+            messages=[
+                {"role": "system", "content": core.REFORMULATE_PROMPT},
+                {"role": "user", "content": content}
+            ],
+            model=core.CHAT_MODEL,
+            temperature=0.3,
+            max_tokens=100,
+        )
+        return result.choices[0].message.content.strip()
+    except Exception:
+        return content  # Fallback to original if LLM fails
+
+
+async def memory_remember_async(content, memory_type="Conversation", tags=None, reformulate=False):
+    if not core.memory_backend.enabled:
+        return None
+    if reformulate:
+        content = await reformulate_for_storage_async(content)
+    try:
+        return await core.memory_backend.remember_async(content, memory_type=memory_type, tags=tags)
+    except Exception as e:
+        print(f"Memory remember error: {e}")
+        return None
+
+
+# ==================== Async Assistant ====================
+
+async def get_llm_response_async(text, use_memory=True):
+    """Async counterpart of app.get_llm_response (same plan, history and memory rules)."""
+    groq_client = get_async_groq_client()
+    if not groq_client and not core.GEMINI_API_KEY:
+        return "Fehler: Weder GROQ_API_KEY noch GEMINI_API_KEY gesetzt.", 0, None
+
+    plan = core.plan_llm_request(text, use_memory)
+    canned_response = plan["canned_response"]
+
+    memories = []
+    if plan["recall"]:
+        memories = await memory_recall_async(text, limit=3)
+
+    messages, prompt_tokens = core.build_llm_messages(text, plan, memories)
+
+    response = canned_response
+    groq_error = None
+
+    if response is None and groq_client:
+        from groq import RateLimitError, APIStatusError
+        try:
+            chat_completion = await groq_client.chat.completions.create(
+                messages=messages,
+                model=core.CHAT_MODEL,
+                temperature=0.7,
+                max_tokens=200,
+            )
+            response = chat_completion.choices[0].message.content
+            core.last_llm_used = "groq"
+        except RateLimitError as e:
+            groq_error = core.format_api_error(e)
+            print(f"Groq rate limit, trying Gemini: {groq_error}")
+        except APIStatusError as e:
+            groq_error = core.format_api_error(e)
+            print(f"Groq API error, trying Gemini: {groq_error}")
+
+    if response is None and core.GEMINI_API_KEY:
+        try:
+            response = await get_gemini_response_async(messages)
+            core.last_llm_used = "gemini"
+        except Exception as e:
+            if groq_error:
+                raise Exception(f"{groq_error} | Gemini-Fallback auch fehlgeschlagen: {str(e)}")
+            raise Exception(core.format_api_error(e))
+
+    if response is None:
+        raise Exception(groq_error or "Kein LLM verfügbar")
+
+    core.record_llm_turn(text, response)
+
+    memory_stored = False
+    store = core.memory_to_store(text, response, plan)
+    if store:
+        memory_content, store_kwargs = store
+        if canned_response:
+            # Confirmation is already spoken; reformulate and store in background
+            spawn(memory_remember_async(memory_content, **store_kwargs))
+            memory_stored = "pending"
+        else:
+            await memory_remember_async(memory_content, **store_kwargs)
+            memory_stored = True
+
+    return response, len(memories), {"stored": memory_stored, "reason": plan["store_reason"], "prompt_tokens": prompt_tokens}
+
+
+async def text_to_speech_async(text):
+    """Render text with edge_tts on the event loop; returns the audio filename."""
+    cached = core.phrase_bank.lookup(text)
+    if cached:
+        return cached
+    filename = f"assistant_{uuid.uuid4().hex[:8]}.mp3"
+    await core.generate_tts_audio(text, os.path.join(core.AUDIO_DIR, filename))
+    return filename
+
+
+async def run_catt_async(command, *args, device=None):
+    """Execute a catt command without blocking the event loop."""
+    cmd = ["catt", "-d", device or core.DEVICE, command, *args]
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+    except Exception as e:
+        return "", str(e), 1
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), CATT_TIMEOUT)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return "", "Timeout", 1
+    return stdout.decode(errors="replace"), stderr.decode(errors="replace"), proc.returncode
+
+
+async def cast_assistant_audio(audio_url):
+    """Stop current playback (and queue auto-advance), then cast the audio."""
+    core.play_queue.stop()
+    await run_catt_async("stop")
+    await asyncio.sleep(0.5)
+    stdout, stderr, code = await run_catt_async("cast", audio_url)
+    if code == 0:
+        core.current_source = {"type": "assistant", "name": "Voice Assistant"}
+    return code, stderr
+
+
+def response_fields(text, response_text, memory_count, memory_info):
+    return {
+        "input": text,
+        "response": response_text,
+        "memory_count": memory_count,
+        "memory_stored": memory_info.get("stored", False) if memory_info else False,
+    }
+
+
+async def assistant_chat(data):
+    """Chat with voice output to Google Home (see app.assistant_chat)."""
+    text = data.get('text', '')
+    try:
+        response_text, memory_count, memory_info = await get_llm_response_async(
+            text, use_memory=data.get('use_memory', True))
+        filename = await text_to_speech_async(response_text)
+        audio_url = f"http://{core.LOCAL_IP}:{core.LOCAL_PORT}/audio/{filename}"
+        code, stderr = await cast_assistant_audio(audio_url)
+        return {
+            "success": code == 0,
+            **response_fields(text, response_text, memory_count, memory_info),
+            "audio_url": audio_url,
+            "message": "Antwort wird abgespielt" if code == 0 else stderr
+        }, 200
+    except Exception as e:
+        error = core.format_api_error(e)
+        # Speak the error on Google Home using the pre-rendered phrase
+        error_audio = core.spoken_error(error)
+        response = {"success": False, "error": error}
+        if error_audio:
+            audio_url = f"http://{core.LOCAL_IP}:{core.LOCAL_PORT}/audio/{error_audio}"
+            code, _ = await cast_assistant_audio(audio_url)
+            if code == 0:
+                response["audio_url"] = audio_url
+        return response, 500
+
+
+async def assistant_chat_text(data):
+    """Chat with text response only (see app.assistant_chat_text)."""
+    text = data.get('text', '')
+    try:
+        response_text, memory_count, memory_info = await get_llm_response_async(
+            text, use_memory=data.get('use_memory', True))
+        return {"success": True, **response_fields(text, response_text, memory_count, memory_info)}, 200
+    except Exception as e:
+        return {"success": False, "error": core.format_api_error(e)}, 500
+
+
+async def assistant_chat_browser(data):
+    """Chat with audio for browser playback (see app.assistant_chat_browser)."""
+    text = data.get('text', '')
+    try:
+        response_text, memory_count, memory_info = await get_llm_response_async(
+            text, use_memory=data.get('use_memory', True))
+        filename = await text_to_speech_async(response_text)
+        return {
+            "success": True,
+            **response_fields(text, response_text, memory_count, memory_info),
+            "audio_url": f"/audio/{filename}",
+            "message": response_text
+        }, 200
+    except Exception as e:
+        error = core.format_api_error(e)
+        error_audio = core.spoken_error(error)
+        response = {"success": False, "error": error}
+        if error_audio:
+            response["audio_url"] = f"/audio/{error_audio}"
+        return response, 500
+
+
+# Path -> (Flask endpoint name, handler); the endpoint name keys deduplication
+# exactly like app.deduplicated does
+ASYNC_ROUTES = {
+    "/api/assistant/chat": ("assistant_chat", assistant_chat),
+    "/api/assistant/chat/text": ("assistant_chat_text", assistant_chat_text),
+    "/api/assistant/chat/browser": ("assistant_chat_browser", assistant_chat_browser),
+}
+
+
+# ==================== ASGI Plumbing ====================
+
+async def read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+async def send_response(send, body, status, headers=()):
+    raw_headers = [(b"content-type", b"application/json"),
+                   (b"content-length", str(len(body)).encode())]
+    raw_headers += [(name.lower().encode(), value.encode()) for name, value in headers]
+    await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+def client_address(scope):
+    headers = dict(scope.get("headers", []))
+    forwarded = headers.get(b"x-forwarded-for", b"").decode()
+    if forwarded:
+        return forwarded.split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else ""
+
+
+async def handle_assistant(scope, receive, send, endpoint, handler):
+    if scope["method"] != "POST":
+        await send_response(send, b'{"error": "Method not allowed"}', 405, [("Allow", "POST")])
+        return
+    try:
+        data = json.loads(await read_body(receive) or b"{}")
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        await send_response(send, b'{"success": false, "error": "Invalid JSON"}', 400)
+        return
+    if not data.get('text'):
+        await send_response(send, b'{"success": false, "error": "No text provided"}', 400)
+        return
+
+    async def compute():
+        # Same lane as the Flask views: admission first, then the handler
+        headers = []
+        try:
+            async with core.assistant_limiter.aslot():
+                payload, status = await handler(data)
+        except Saturated as e:
+            payload, status = core.saturated_payload(e.retry_after), 503
+            headers.append(("Retry-After", str(e.retry_after)))
+        return json.dumps(payload).encode(), status, headers
+
+    text = normalize_text(str(data['text']))
+    if not text:
+        body, status, headers = await compute()
+    else:
+        key = (client_address(scope), text, endpoint, bool(data.get('use_memory', True)))
+        (body, status, headers), shared = await core.assistant_dedup.run_async(key, compute)
+        if shared:
+            headers = headers + [("X-Deduplicated", "1")]
+    await send_response(send, body, status, headers)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # The warm-up probes this port to log the startup time
+            core.start_background_services(int(os.environ.get("PORT", core.LOCAL_PORT)))
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if _http_client is not None:
+                await _http_client.aclose()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+# ==================== WSGI Bridge ====================
+
+_wsgi_pool = ThreadPoolExecutor(max_workers=WSGI_WORKERS, thread_name_prefix="wsgi")
+
+
+def build_environ(scope, body):
+    """PEP 3333 environ for an ASGI HTTP scope."""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": str(server[0]),
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        if name in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            environ[name] = value
+            continue
+        key = f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def call_wsgi(environ):
+    """Run the Flask app and collect (status, headers, body); runs on _wsgi_pool."""
+    started = {}
+    chunks = []
+
+    def start_response(status, headers, exc_info=None):
+        started["status"] = int(status.split(" ", 1)[0])
+        started["headers"] = headers
+        return chunks.append
+
+    result = core.app(environ, start_response)
+    try:
+        for chunk in result:
+            chunks.append(chunk)
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+    return started["status"], started["headers"], b"".join(chunks)
+
+
+async def serve_wsgi(scope, receive, send):
+    body = await read_body(receive)
+    loop = asyncio.get_running_loop()
+    status, headers, content = await loop.run_in_executor(
+        _wsgi_pool, call_wsgi, build_environ(scope, body))
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in headers],
+    })
+    await send({"type": "http.response.body", "body": content})
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] == "http" and scope["path"] in ASYNC_ROUTES:
+        endpoint, handler = ASYNC_ROUTES[scope["path"]]
+        await handle_assistant(scope, receive, send, endpoint, handler)
+        return
+    if scope["type"] == "http":
+        await serve_wsgi(scope, receive, send)
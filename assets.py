@@ -0,0 +1,136 @@
+"""Google Home Web Controller - Static asset pipeline
+
+Builds the JS/CSS assets once at startup, without a separate build step:
+minify (conservatively), fingerprint with a content hash and precompress
+with gzip and, if the optional `brotli` package is installed, brotli.
+Fingerprinted URLs never change content, so they are served with
+immutable cache headers.
+"""
+
+import gzip
+import hashlib
+import os
+import re
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+MIMETYPES = {
+    ".js": "application/javascript; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+}
+
+
+def minify_js(source):
+    """Drop indentation, blank lines, full-line // comments and block comments
+    that start a line (code after their closing */ is kept).
+
+    Deliberately line-based: no tokenizer, so string and regex literals
+    (e.g. URLs containing //) are never touched.
+    """
+    lines = []
+    in_block_comment = False
+    for line in source.splitlines():
+        stripped = line.strip()
+        if in_block_comment:
+            if "*/" not in stripped:
+                continue
+            stripped = stripped.split("*/", 1)[1].strip()
+            in_block_comment = False
+        while stripped.startswith("/*"):
+            if "*/" not in stripped[2:]:
+                in_block_comment = True
+                stripped = ""
+                break
+            stripped = stripped[2:].split("*/", 1)[1].strip()
+        if not stripped or stripped.startswith("//"):
+            continue
+        lines.append(stripped)
+    return "\n".join(lines) + "\n"
+
+
+def minify_css(source):
+    """Strip comments and collapse whitespace around CSS punctuation."""
+    source = re.sub(r"/\*.*?\*/", "", source, flags=re.DOTALL)
+    source = re.sub(r"\s+", " ", source)
+    source = re.sub(r"\s*([{};,>])\s*", r"\1", source)
+    source = re.sub(r":\s+", ":", source)
+    source = source.replace(";}", "}")
+    return source.strip() + "\n"
+
+
+MINIFIERS = {
+    ".js": minify_js,
+    ".css": minify_css,
+}
+
+
+def compress(body):
+    """Return {encoding: bytes} with the precompressed variants of body."""
+    variants = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=11)
+    return variants
+
+
+def content_etag(body):
+    """Strong ETag value for a response body."""
+    return hashlib.sha256(body).hexdigest()[:16]
+
+
+def choose_encoding(accept_encodings, variants):
+    """Pick the best precompressed variant the client accepts (or None)."""
+    for encoding in ("br", "gzip"):
+        if encoding in variants and accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+class Asset:
+    """One built asset: minified body plus precompressed variants."""
+
+    def __init__(self, name, body, mimetype):
+        self.name = name
+        self.body = body
+        self.mimetype = mimetype
+        self.digest = hashlib.sha256(body).hexdigest()[:12]
+        stem, ext = os.path.splitext(name)
+        self.fingerprinted_name = f"{stem}.{self.digest}{ext}"
+        self.variants = compress(body)
+
+
+class AssetPipeline:
+    """Builds and serves fingerprinted assets from a static directory."""
+
+    def __init__(self, static_dir, url_prefix="/assets"):
+        self.static_dir = static_dir
+        self.url_prefix = url_prefix
+        self.assets = {}  # source name -> Asset
+        self.by_fingerprint = {}  # fingerprinted name -> Asset
+
+    def build(self):
+        """Minify, fingerprint and compress every JS/CSS file in static_dir."""
+        self.assets.clear()
+        self.by_fingerprint.clear()
+        for name in sorted(os.listdir(self.static_dir)):
+            ext = os.path.splitext(name)[1]
+            if ext not in MINIFIERS:
+                continue
+            with open(os.path.join(self.static_dir, name), encoding="utf-8") as f:
+                source = f.read()
+            body = MINIFIERS[ext](source).encode("utf-8")
+            asset = Asset(name, body, MIMETYPES[ext])
+            self.assets[name] = asset
+            self.by_fingerprint[asset.fingerprinted_name] = asset
+        return self
+
+    def url(self, name):
+        """URL of the fingerprinted asset (falls back to the raw static file)."""
+        asset = self.assets.get(name)
+        if asset is None:
+            return f"/static/{name}"
+        return f"{self.url_prefix}/{asset.fingerprinted_name}"
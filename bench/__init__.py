@@ -0,0 +1 @@
+"""Offline load-test harness for the Google Home Web Controller."""
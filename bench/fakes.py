@@ -0,0 +1,199 @@
+"""Local fake services for the load-test harness.
+
+- FakeLLMServer answers Groq (OpenAI-compatible) and Gemini REST requests
+- FakeShodhServer answers the SHODH Cloudflare memory API
+"""
+
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_REPLIES = [
+    "Alles klar, isch erledigt.",
+    "Morn am zähni hesch es Meeting.",
+    "Das weiss i leider nöd.",
+    "SRF 3 lauft grad.",
+]
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    """Base handler with JSON helpers and silent logging."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(body or b"{}")
+        except ValueError:
+            return {}
+
+    def send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _FakeServer:
+    """Runs a ThreadingHTTPServer on a background thread."""
+
+    handler_class = _JSONHandler
+
+    def __init__(self, host="127.0.0.1", port=0, delay=0.0):
+        self.delay = delay
+        self.requests = 0
+        self._lock = threading.Lock()
+        handler = type("Handler", (self.handler_class,), {"fake": self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self):
+        with self._lock:
+            self.requests += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _LLMHandler(_JSONHandler):
+
+    def do_POST(self):
+        fake = self.fake
+        fake.count()
+        data = self.read_json()
+        time.sleep(fake.delay)
+
+        # Groq: POST /openai/v1/chat/completions
+        if self.path.startswith("/openai/v1/chat/completions"):
+            # The Groq SDK retries 429s (max_retries=2); a request chosen for
+            # rate limiting fails its retries too, so the app sees the error
+            retried = int(self.headers.get("x-stainless-retry-count", "0") or 0) > 0
+            if retried or (fake.rate_limit_ratio and random.random() < fake.rate_limit_ratio):
+                self.send_json(
+                    {"error": {"message": "Rate limit reached. Please try again in 1.5s.",
+                               "type": "tokens", "code": "rate_limit_exceeded"}},
+                    status=429,
+                    headers={"retry-after": "2",
+                             "x-ratelimit-remaining-requests": "0",
+                             "x-ratelimit-limit-requests": "30"},
+                )
+                return
+            prompt_chars = sum(len(m.get("content", "")) for m in data.get("messages", []))
+            self.send_json({
+                "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": data.get("model", "llama-3.3-70b-versatile"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": random.choice(CANNED_REPLIES)},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": prompt_chars // 4, "completion_tokens": 12,
+                          "total_tokens": prompt_chars // 4 + 12},
+            })
+            return
+
+        # Gemini REST: POST /v1beta/models/<model>:generateContent
+        if ":generateContent" in self.path:
+            self.send_json({
+                "candidates": [{
+                    "content": {"parts": [{"text": random.choice(CANNED_REPLIES)}], "role": "model"},
+                    "finishReason": "STOP",
+                    "index": 0,
+                }],
+            })
+            return
+
+        self.send_json({"error": "not found"}, status=404)
+
+
+class FakeLLMServer(_FakeServer):
+    """Fake Groq + Gemini endpoint.
+
+    rate_limit_ratio is the share of Groq requests answered with HTTP 429
+    on every attempt. The SDK's retries (retry-after: 2, so about 4 s) are
+    exhausted and the app falls back to Gemini, as with a real rate limit.
+    """
+
+    handler_class = _LLMHandler
+
+    def __init__(self, host="127.0.0.1", port=0, delay=0.8, rate_limit_ratio=0.0):
+        super().__init__(host, port, delay)
+        self.rate_limit_ratio = rate_limit_ratio
+
+
+class _ShodhHandler(_JSONHandler):
+
+    def do_GET(self):
+        fake = self.fake
+        fake.count()
+        time.sleep(fake.delay)
+        if self.path.startswith("/api/stats"):
+            with fake._lock:
+                total = len(fake.memories)
+            self.send_json({"total_memories": total})
+            return
+        self.send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        fake = self.fake
+        fake.count()
+        data = self.read_json()
+        time.sleep(fake.delay)
+
+        if self.path.startswith("/api/recall"):
+            limit = int(data.get("limit", 3))
+            with fake._lock:
+                memories = fake.memories[-limit:]
+            self.send_json({"memories": memories})
+        elif self.path.startswith("/api/remember"):
+            memory = {"id": uuid.uuid4().hex, "content": data.get("content", ""),
+                      "type": data.get("type", "Conversation"), "tags": data.get("tags", [])}
+            with fake._lock:
+                fake.memories.append(memory)
+            self.send_json({"id": memory["id"], "success": True})
+        elif self.path.startswith("/api/context"):
+            limit = int(data.get("max_results", 3))
+            with fake._lock:
+                memories = fake.memories[-limit:]
+            self.send_json({"surfaced_memories": memories, "count": len(memories)})
+        else:
+            self.send_json({"error": "not found"}, status=404)
+
+
+class FakeShodhServer(_FakeServer):
+    """Fake SHODH Cloudflare memory API with an in-memory store."""
+
+    handler_class = _ShodhHandler
+
+    def __init__(self, host="127.0.0.1", port=0, delay=0.15):
+        super().__init__(host, port, delay)
+        self.memories = [
+            {"id": "seed-1", "content": "Der Benutzer heisst Henry.", "type": "Learning"},
+            {"id": "seed-2", "content": "Der Benutzer hört gerne SRF 3.", "type": "Learning"},
+        ]
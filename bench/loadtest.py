@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""Offline load test for the Google Home Web Controller.
+
+Starts fake Groq/Gemini and SHODH servers, puts a fake `catt` on PATH and a
+stubbed edge_tts on PYTHONPATH, launches the Flask app in a subprocess and
+drives a realistic mix of /api/info polling, control clicks and assistant
+chats at increasing concurrency.
+
+Usage:
+    python -m bench.loadtest
+    python -m bench.loadtest --levels 1,8,32 --duration 20 --save bench.json
+    python -m bench.loadtest --baseline bench.json --tolerance 0.25
+    python -m bench.loadtest --asgi --mix chat=1 --levels 8,32
+
+With --baseline the run fails (exit code 1) if any endpoint's p95 latency
+got worse than the baseline by more than the tolerance.
+"""
+
+import argparse
+import atexit
+import json
+import math
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+from bench.fakes import FakeLLMServer, FakeShodhServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+
+# Traffic mix: group -> weight
+DEFAULT_MIX = {"info": 70, "control": 22, "chat": 8}
+
+CHAT_TEXTS = [
+    "Was weisst du über mein Meeting morgen?",
+    "Merke dir: Ich habe morgen um 10 Uhr einen Termin beim Zahnarzt.",
+    "Wie wird das Wetter am Wochenende in Zürich?",
+    "Hallo",
+    "Erinnerst du dich an meinen Lieblingssender?",
+]
+
+
+# ==================== Scenarios ====================
+
+def scenario_info(session, base, rng):
+    return "GET /api/info", session.get(f"{base}/api/info", timeout=30)
+
+
+def scenario_control(session, base, rng):
+    choice = rng.random()
+    if choice < 0.45:
+        level = rng.randint(0, 100)
+        return "POST /api/volume/<level>", session.post(f"{base}/api/volume/{level}", timeout=30)
+    if choice < 0.60:
+        endpoint = rng.choice(["/api/volumeup", "/api/volumedown"])
+        return f"POST {endpoint}", session.post(f"{base}{endpoint}", timeout=30)
+    if choice < 0.75:
+        pos = f"{rng.randint(0, 2)}:{rng.randint(0, 59):02d}"
+        return "POST /api/seek/<time>", session.post(f"{base}/api/seek/{pos}", timeout=30)
+    endpoint = rng.choice(["/api/play", "/api/pause"])
+    return f"POST {endpoint}", session.post(f"{base}{endpoint}", timeout=30)
+
+
+def scenario_chat(session, base, rng):
+    endpoint = rng.choices(
+        ["/api/assistant/chat/browser", "/api/assistant/chat/text", "/api/assistant/chat"],
+        weights=[5, 3, 2],
+    )[0]
+    payload = {"text": rng.choice(CHAT_TEXTS)}
+    return f"POST {endpoint}", session.post(f"{base}{endpoint}", json=payload, timeout=60)
+
+
+SCENARIOS = {
+    "info": scenario_info,
+    "control": scenario_control,
+    "chat": scenario_chat,
+}
+
+
+# ==================== Statistics ====================
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct * len(sorted_values) / 100.0))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples, elapsed):
+    """Group (endpoint, latency, status) samples into per-endpoint stats.
+
+    503 responses (admission control) count as rejected, not as errors.
+    """
+    by_endpoint = {}
+    for endpoint, latency, status in samples:
+        by_endpoint.setdefault(endpoint, []).append((latency, status))
+
+    stats = {}
+    for endpoint, values in sorted(by_endpoint.items()):
+        latencies = sorted(v[0] for v in values)
+        stats[endpoint] = {
+            "count": len(values),
+            "errors": sum(1 for v in values if v[1] >= 400 and v[1] != 503),
+            "rejected": sum(1 for v in values if v[1] == 503),
+            "rps": len(values) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+        }
+    return stats
+
+
+def print_report(concurrency, stats, elapsed):
+    total = sum(s["count"] for s in stats.values())
+    print(f"\n== concurrency {concurrency}: {total} requests in {elapsed:.1f}s "
+          f"({total / elapsed:.1f} req/s) ==")
+    print(f"{'endpoint':<36} {'count':>6} {'err':>4} {'rej':>4} {'req/s':>7} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for endpoint, s in stats.items():
+        print(f"{endpoint:<36} {s['count']:>6} {s['errors']:>4} {s['rejected']:>4} {s['rps']:>7.2f} "
+              f"{s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f}")
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Return a list of regression messages (empty if none)."""
+    regressions = []
+    for level, stats in results.items():
+        for endpoint, current in stats.items():
+            previous = baseline.get(level, {}).get(endpoint)
+            if not previous or not previous.get("p95_ms"):
+                continue
+            limit = previous["p95_ms"] * (1 + tolerance)
+            if current["p95_ms"] > limit:
+                regressions.append(
+                    f"c={level} {endpoint}: p95 {current['p95_ms']:.1f} ms "
+                    f"> {limit:.1f} ms (baseline {previous['p95_ms']:.1f} ms)"
+                )
+    return regressions
+
+
+# ==================== Load Driver ====================
+
+def run_level(base, concurrency, duration, mix, think_time, seed):
+    """Run `concurrency` workers for `duration` seconds and collect samples."""
+    samples = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    groups = list(mix.keys())
+    weights = [mix[g] for g in groups]
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        session = requests.Session()
+        # One client per worker, so workers never share a deduplicated chat
+        session.headers["X-Forwarded-For"] = f"10.0.{index // 256}.{index % 256}"
+        local = []
+        while time.monotonic() < deadline:
+            scenario = SCENARIOS[rng.choices(groups, weights=weights)[0]]
+            start = time.perf_counter()
+            try:
+                endpoint, response = scenario(session, base, rng)
+                status = response.status_code
+                if response.headers.get("X-Deduplicated"):
+                    # Shared results say nothing about the assistant path
+                    endpoint += " (dedup)"
+            except requests.RequestException as e:
+                endpoint, status = f"error {type(e).__name__}", 599
+            local.append((endpoint, time.perf_counter() - start, status))
+            if think_time:
+                time.sleep(rng.uniform(0, think_time))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    start = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.monotonic() - start
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_app(port, llm, shodh, args):
+    """Launch the app with all external dependencies pointed at fakes."""
+    env = dict(os.environ)
+    env["PATH"] = os.path.join(BENCH_DIR, "bin") + os.pathsep + env.get("PATH", "")
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.path.join(BENCH_DIR, "stubs"), REPO_ROOT, env.get("PYTHONPATH", "")]
+    )
+    env["PYTHONUNBUFFERED"] = "1"
+    env["GROQ_API_KEY"] = "bench"
+    env["GROQ_BASE_URL"] = llm.url
+    env["GEMINI_API_KEY"] = "bench"
+    env["GEMINI_API_ENDPOINT"] = llm.url
+    env["SHODH_CLOUDFLARE_URL"] = shodh.url
+    env["SHODH_CLOUDFLARE_API_KEY"] = "bench"
+    env["FAKE_CATT_DELAY"] = str(args.catt_delay)
+    env["FAKE_CATT_DELAYS"] = args.catt_delays
+    env["EDGE_TTS_STUB_DELAY"] = str(args.tts_delay)
+
+    # Keep fake chats, jobs, memories and stub audio out of the real history,
+    # schedule, local memory store and phrase bank
+    state_dir = tempfile.mkdtemp(prefix="ghome-bench-")
+    atexit.register(shutil.rmtree, state_dir, True)
+    env["GHOME_HISTORY_FILE"] = os.path.join(state_dir, "history.jsonl")
+    env["GHOME_SCHEDULE_FILE"] = os.path.join(state_dir, "schedule.json")
+    env["GHOME_MEMORY_FILE"] = os.path.join(state_dir, "memories.jsonl")
+    env["GHOME_AUDIO_DIR"] = os.path.join(state_dir, "audio")
+    # Repeated CHAT_TEXTS must run the full assistant path, not hit the dedup cache
+    env["GHOME_DEDUP_WINDOW"] = "0"
+
+    log = open(args.server_log, "w") if args.server_log else subprocess.DEVNULL
+    command = [sys.executable, "-m", "bench.serve", "--port", str(port)]
+    if getattr(args, "asgi", False):
+        command.append("--asgi")
+    proc = subprocess.Popen(
+        command,
+        cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+
+    base = f"http://127.0.0.1:{port}"
+    started = time.monotonic()
+    while time.monotonic() - started < 60:
+        if proc.poll() is not None:
+            raise RuntimeError(f"App exited during startup (code {proc.returncode})")
+        try:
+            requests.get(f"{base}/api/radio/stations", timeout=1)
+            return proc, base, time.monotonic() - started
+        except requests.RequestException:
+            time.sleep(0.05)
+    proc.terminate()
+    raise RuntimeError("App did not come up within 60s")
+
+
+def parse_mix(value):
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario group: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Offline load test with fake catt, fake LLM and fake SHODH.")
+    parser.add_argument("--levels", default="1,4,16,32",
+                        help="comma-separated concurrency levels (default: 1,4,16,32)")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="seconds per concurrency level (default: 10)")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="traffic mix, e.g. info=70,control=22,chat=8")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="max random pause between requests per worker (s)")
+    parser.add_argument("--catt-delay", type=float, default=0.3,
+                        help="fake catt delay per command (s)")
+    parser.add_argument("--catt-delays", default="info=0.4,cast=1.0",
+                        help="per-command fake catt delays, e.g. info=0.4,cast=1.0")
+    parser.add_argument("--llm-delay", type=float, default=0.8, help="fake LLM latency (s)")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.1,
+                        help="share of Groq requests rate-limited on every retry, "
+                             "i.e. falling back to Gemini (default: 0.1)")
+    parser.add_argument("--shodh-delay", type=float, default=0.15,
+                        help="fake SHODH latency (s)")
+    parser.add_argument("--tts-delay", type=float, default=0.2, help="stub TTS latency (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare p95 latencies to this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed p95 regression vs. baseline (default: 0.25)")
+    parser.add_argument("--server-log", help="write app stdout/stderr to this file")
+    parser.add_argument("--asgi", action="store_true",
+                        help="run the app under uvicorn via asgi.py instead of threaded WSGI")
+    args = parser.parse_args(argv)
+
+    levels = [int(x) for x in args.levels.split(",") if x.strip()]
+
+    llm = FakeLLMServer(delay=args.llm_delay, rate_limit_ratio=args.rate_limit_ratio).start()
+    shodh = FakeShodhServer(delay=args.shodh_delay).start()
+    proc, base, startup = start_app(free_port(), llm, shodh, args)
+    print(f"App ready after {startup * 1000:.0f} ms at {base}")
+
+    results = {}
+    try:
+        for concurrency in levels:
+            samples, elapsed = run_level(base, concurrency, args.duration,
+                                         args.mix, args.think_time, args.seed)
+            stats = summarize(samples, elapsed)
+            results[str(concurrency)] = stats
+            print_report(concurrency, stats, elapsed)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        llm.stop()
+        shodh.stop()
+
+    print(f"\nFake LLM calls: {llm.requests}, fake SHODH calls: {shodh.requests}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"startup_ms": startup * 1000, "levels": results}, f, indent=2)
+        print(f"Results saved to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline.get("levels", {}), args.tolerance)
+        if regressions:
+            print("\nRegressions vs. baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo p95 regressions vs. baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Measure recall latency of the local memory engine at scale.
+
+Indexes a synthetic store of German assistant memories (default 100k)
+in memory, then times recall() for a set of queries and reports build time
+and p50/p95/p99 latency. Nothing is written to disk.
+
+Usage:
+    python -m bench.memory_recall
+    python -m bench.memory_recall --memories 200000 --queries 500
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from bench.loadtest import percentile
+from local_memory import LocalMemoryBackend
+
+SUBJECTS = ["Der Benutzer", "Henry", "Die Familie", "Das Team", "Die Nachbarin"]
+VERBS = ["mag", "hört gern", "plant", "besucht", "kauft", "vergisst oft", "repariert"]
+OBJECTS = [
+    "SRF 3", "Radio Swiss Jazz", "den Zahnarzt", "das Meeting", "Pizza", "den Garten",
+    "die Ferien in Italien", "das Velo", "den Geburtstag der Mutter", "Zürich",
+    "den Kühlschrank", "das Konzert", "die Steuererklärung", "den Hund", "Kaffee",
+]
+TIMES = ["morgen", "am Montag", "um 10 Uhr", "am Wochenende", "jeden Abend", "im Sommer", ""]
+
+
+def synthetic_memories(count, rng):
+    for i in range(count):
+        content = f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(TIMES)}".strip()
+        yield {"id": f"m{i}", "content": content + ".", "type": "Learning",
+               "tags": ["bench"], "created": 0.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark local memory recall.")
+    parser.add_argument("--memories", type=int, default=100_000,
+                        help="number of synthetic memories (default: 100000)")
+    parser.add_argument("--queries", type=int, default=200, help="number of recalls (default: 200)")
+    parser.add_argument("--limit", type=int, default=3, help="memories per recall (default: 3)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    backend = LocalMemoryBackend(path="/nonexistent/bench-memories.jsonl")
+
+    start = time.perf_counter()
+    backend.add_many(synthetic_memories(args.memories, rng))
+    build = time.perf_counter() - start
+    print(f"Indexed {args.memories} memories in {build:.1f}s")
+
+    queries = [f"Was weisst du über {rng.choice(OBJECTS)}?" for _ in range(args.queries)]
+    backend.recall(queries[0], limit=args.limit)  # warm caches
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        backend.recall(query, limit=args.limit)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    print(f"recall x{args.queries}: p50 {percentile(latencies, 50) * 1000:.1f} ms, "
+          f"p95 {percentile(latencies, 95) * 1000:.1f} ms, "
+          f"p99 {percentile(latencies, 99) * 1000:.1f} ms")
+    print(f"example: {queries[0]!r} -> "
+          f"{[m['content'] for m in backend.recall(queries[0], limit=args.limit)]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""Run the app for benchmarking: threaded WSGI server, or uvicorn with --asgi.
+
+Started by bench.loadtest in a subprocess so the load generator does not
+share a GIL with the server under test.
+"""
+
+import argparse
+import os
+import sys
+
+from werkzeug.serving import make_server
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--asgi", action="store_true",
+                        help="serve asgi:application with uvicorn (needs uvicorn)")
+    args = parser.parse_args()
+
+    if args.asgi:
+        import uvicorn
+        # asgi.py starts the background services on lifespan startup
+        os.environ["PORT"] = str(args.port)
+        print(f"serving (ASGI) on http://{args.host}:{args.port}", flush=True)
+        uvicorn.run("asgi:application", host=args.host, port=args.port,
+                    log_level="warning", access_log=False)
+        return
+
+    import app as ghome
+
+    server = make_server(args.host, args.port, ghome.app, threaded=True)
+    ghome.start_background_services(args.port)
+    print(f"serving on http://{args.host}:{args.port}", flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Measure how long the app takes until it answers its first request.
+
+Spawns the app (with the same fakes as bench.loadtest) several times and
+reports the time from process start to the first successful response on a
+control endpoint. Exits with code 1 if the median exceeds the budget.
+
+Usage:
+    python -m bench.startup
+    python -m bench.startup --runs 10 --budget-ms 600
+"""
+
+import argparse
+import statistics
+import sys
+
+from bench.fakes import FakeLLMServer, FakeShodhServer
+from bench.loadtest import free_port, start_app
+from config import STARTUP_BUDGET_MS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure app startup time.")
+    parser.add_argument("--runs", type=int, default=5, help="number of restarts (default: 5)")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS,
+                        help=f"median startup budget in ms (default: {STARTUP_BUDGET_MS})")
+    args = parser.parse_args(argv)
+
+    # start_app reads these from the loadtest options
+    app_args = argparse.Namespace(catt_delay=0.3, catt_delays="", tts_delay=0.2, server_log=None)
+
+    llm = FakeLLMServer().start()
+    shodh = FakeShodhServer().start()
+    timings = []
+    try:
+        for run in range(args.runs):
+            proc, base, startup = start_app(free_port(), llm, shodh, app_args)
+            proc.terminate()
+            proc.wait(timeout=5)
+            timings.append(startup * 1000)
+            print(f"run {run + 1}: ready after {startup * 1000:.0f} ms")
+    finally:
+        llm.stop()
+        shodh.stop()
+
+    median = statistics.median(timings)
+    print(f"\nmedian {median:.0f} ms, min {min(timings):.0f} ms, max {max(timings):.0f} ms "
+          f"(budget {args.budget_ms:.0f} ms)")
+    if median > args.budget_ms:
+        print("Startup budget exceeded.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
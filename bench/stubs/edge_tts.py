@@ -0,0 +1,29 @@
+"""Offline stand-in for the edge_tts package used by the load-test harness.
+
+Writes a tiny MP3 frame instead of calling the Microsoft endpoint. The
+synthesis time is set via EDGE_TTS_STUB_DELAY (seconds, default 0.2).
+"""
+
+import asyncio
+import os
+
+# One silent MPEG-1 Layer III frame, enough for players that sniff the header
+SILENT_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+
+
+class Communicate:
+    """Mimics edge_tts.Communicate(text, voice)."""
+
+    def __init__(self, text, voice, **kwargs):
+        self.text = text
+        self.voice = voice
+
+    async def stream(self):
+        await asyncio.sleep(float(os.environ.get("EDGE_TTS_STUB_DELAY", "0.2")))
+        yield {"type": "audio", "data": SILENT_FRAME}
+
+    async def save(self, audio_fname, metadata_fname=None):
+        with open(audio_fname, "wb") as f:
+            async for chunk in self.stream():
+                if chunk["type"] == "audio":
+                    f.write(chunk["data"])
@@ -0,0 +1,116 @@
+"""Google Home Web Controller - Device command coalescing
+
+Volume slider drags and seek clicks arrive in bursts. Running one catt
+process per request piles up processes that finish out of order, so
+commands are queued per device and merged while they wait:
+
+- set-style commands (volume 40, seek 1:30) are latest-wins: a new value
+  replaces whatever is still pending for the same family
+- relative commands (volumeup/volumedown) accumulate into one delta, or
+  are folded into a pending absolute value
+
+Each device has at most one pending operation per family, and a single
+worker thread runs them in order. Every request gets a Future resolved
+with the (stdout, stderr, returncode) of the operation that absorbed it.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class _PendingOp:
+    """One queued device operation and the requests waiting on it."""
+
+    def __init__(self, command, value):
+        self.command = command
+        self.value = value
+        self.futures = []
+
+
+class CommandCoalescer:
+    """Per-device, in-order command queue that merges bursts.
+
+    execute(device, command, *args) runs one device command and returns
+    (stdout, stderr, returncode).
+    """
+
+    def __init__(self, execute):
+        self._execute = execute
+        self._lock = threading.Lock()
+        self._pending = {}  # device -> OrderedDict(family -> _PendingOp)
+        self._workers = set()  # devices with a running worker
+        self.submitted = 0
+        self.executed = 0
+
+    def submit_set(self, device, family, command, value):
+        """Queue an absolute command; replaces anything pending in its family."""
+        future = Future()
+        with self._lock:
+            self.submitted += 1
+            queue = self._pending.setdefault(device, OrderedDict())
+            op = queue.pop(family, None)
+            futures = op.futures if op else []
+            # Re-append so the op runs after everything queued before it
+            new_op = _PendingOp(command, value)
+            new_op.futures = futures + [future]
+            queue[family] = new_op
+            self._ensure_worker(device)
+        return future
+
+    def submit_delta(self, device, family, delta, up_command, down_command,
+                     set_command=None, bounds=(0, 100)):
+        """Queue a relative change; accumulates with pending changes in its family.
+
+        If an absolute set_command is pending, the delta is applied to its
+        value (clamped to bounds) instead of adding another operation.
+        """
+        future = Future()
+        with self._lock:
+            self.submitted += 1
+            queue = self._pending.setdefault(device, OrderedDict())
+            op = queue.get(family)
+            if op is not None and op.command == set_command and set_command is not None:
+                low, high = bounds
+                op.value = max(low, min(high, op.value + delta))
+            elif op is not None and op.command == (up_command, down_command):
+                op.value += delta
+            else:
+                op = _PendingOp((up_command, down_command), delta)
+                queue[family] = op
+            op.futures.append(future)
+            self._ensure_worker(device)
+        return future
+
+    def _ensure_worker(self, device):
+        # Caller holds self._lock
+        if device not in self._workers:
+            self._workers.add(device)
+            threading.Thread(target=self._run, args=(device,), daemon=True).start()
+
+    def _run(self, device):
+        while True:
+            with self._lock:
+                queue = self._pending.get(device)
+                if not queue:
+                    self._workers.discard(device)
+                    return
+                _, op = queue.popitem(last=False)
+
+            try:
+                result = self._run_op(device, op)
+            except Exception as e:
+                result = ("", str(e), 1)
+            for future in op.futures:
+                future.set_result(result)
+
+    def _run_op(self, device, op):
+        if isinstance(op.command, tuple):
+            up_command, down_command = op.command
+            if op.value == 0:
+                return "", "", 0
+            command = up_command if op.value > 0 else down_command
+            self.executed += 1
+            return self._execute(device, command, str(abs(op.value)))
+        self.executed += 1
+        return self._execute(device, op.command, str(op.value))
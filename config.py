@@ -57,9 +57,82 @@ YOUTUBE_FAVORITES = {
 LOCAL_IP = "10.0.1.56"
 LOCAL_PORT = 5000
 
+# Import and initialize LLM/TTS clients in the background once the server
+# is listening (otherwise they are loaded on the first assistant request)
+ASSISTANT_WARMUP = True
+
+# Scheduled jobs, persisted as JSON (relative to the app directory,
+# $GHOME_SCHEDULE_FILE overrides it)
+SCHEDULE_FILE = "schedule.json"
+
+# Seconds before a scheduled job to resolve streams, render TTS and wake the device
+SCHEDULER_PREWARM_SECONDS = 10
+
+# Startup time budget in milliseconds (logged after startup, checked by bench.startup)
+STARTUP_BUDGET_MS = 800
+
 # Conversation history
 MAX_HISTORY = 5
 
+# Conversation history log, append-only JSONL (relative to the app directory,
+# $GHOME_HISTORY_FILE overrides it).
+# Appends are fsynced in batches at most every HISTORY_FSYNC_INTERVAL seconds;
+# the log is compacted once HISTORY_COMPACT_RECORDS records can be dropped.
+HISTORY_FILE = "history.jsonl"
+HISTORY_FSYNC_INTERVAL = 1.0
+HISTORY_COMPACT_RECORDS = 200
+
+# Admission control for the assistant chat endpoints: at most this many run
+# at once, a few more may wait, the rest get 503 + Retry-After right away
+ASSISTANT_MAX_CONCURRENT = 2
+ASSISTANT_MAX_WAITING = 4
+ASSISTANT_WAIT_TIMEOUT = 15  # seconds a request may wait for a slot
+
+# Identical assistant requests (same client, text and endpoint) attach to
+# the one in flight; a successful answer is reused for this many seconds
+# ($GHOME_DEDUP_WINDOW overrides it)
+ASSISTANT_DEDUP_WINDOW = 3
+
+# Estimated input token budget per LLM request (persona, summary, history, memories)
+PROMPT_TOKEN_BUDGET = 1200
+
+# Max tokens of the rolling summary of turns older than MAX_HISTORY
+HISTORY_SUMMARY_TOKENS = 120
+
+# Memory backend: "shodh" (SHODH Cloudflare API) or "local" (in-process
+# BM25 + vector search, needs numpy)
+MEMORY_BACKEND = "shodh"
+
+# Local memory store, append-only JSONL (relative to the app directory,
+# $GHOME_MEMORY_FILE overrides it)
+LOCAL_MEMORY_FILE = "memories.jsonl"
+
+# ==================== Phrase Bank ====================
+# Pre-synthesized with TTS_VOICE in the background after startup, so these
+# replies play without a TTS round trip.
+
+# Confirmation for explicit "Merke dir: ..." requests (replaces the LLM reply)
+MEMORY_CONFIRMATION_PHRASES = [
+    "Alles klar, han mir's gmerkt.",
+    "Isch notiert.",
+]
+
+# Spoken errors, keyed by the prefix of the message from format_api_error()
+ERROR_PHRASES = {
+    "API-Limit": "API-Limit erreicht. Bitte warte kurz und versuch es nochmal.",
+    "API-Auth": "API-Authentifizierung fehlgeschlagen. Bitte API-Key prüfen.",
+    "Zeitüberschreitung": "Zeitüberschreitung bei der Anfrage. Bitte nochmal versuchen.",
+    "Verbindungsfehler": "Verbindungsfehler. Bitte Internetverbindung prüfen.",
+    "Fehler": "Fehler bei der Verarbeitung. Bitte später nochmal versuchen.",
+}
+
+# Short replies the assistant often gives verbatim
+COMMON_PHRASES = [
+    "Alles klar.",
+    "Gern gscheh.",
+    "Das weiss i leider nöd.",
+]
+
 # ==================== Memory Trigger Patterns ====================
 
 # Explicit memory storage triggers (German + English)
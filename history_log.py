@@ -0,0 +1,170 @@
+"""Google Home Web Controller - Durable conversation history
+
+Turns and rolling-summary updates are appended to a JSONL log, so the
+assistant keeps its context across crashes and restarts:
+
+    {"t": "turn", "seq": 7, "user": "...", "assistant": "..."}
+    {"t": "summary", "through": 4, "text": "..."}
+
+Appends are written and flushed to the OS right away (they survive a
+process crash); fsync runs batched on a background thread at most every
+`fsync_interval` seconds. Once enough records piled up the log is
+compacted to the latest summary plus the turns it does not cover yet.
+At startup the whole file is read in one go and replayed.
+"""
+
+import json
+import os
+import threading
+
+
+class HistoryLog:
+    """Append-only conversation log with batched fsync and compaction.
+
+    keep is the number of recent turns that must survive a compaction
+    (MAX_HISTORY); turns newer than the last summary are always kept.
+    """
+
+    def __init__(self, path, keep, fsync_interval=1.0, compact_records=200):
+        self.path = path
+        self.keep = keep
+        self.fsync_interval = fsync_interval
+        self.compact_records = compact_records
+        self.summary = ""
+        self.through = 0  # seq of the last turn folded into the summary
+        self._turns = []  # turns still needed after a compaction
+        self._seq = 0
+        self._records = 0  # records in the file since the last compaction
+        self._file = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    # ---------- Startup ----------
+
+    def load(self):
+        """Replay the log; returns (recent_turns, summary, unsummarized_older_turns)."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = ""
+        except OSError as e:
+            print(f"History: could not read {self.path}: {e}")
+            data = ""
+
+        with self._lock:
+            for line in data.splitlines():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn last line after a crash
+                self._apply(record)
+                self._records += 1
+            recent = self._turns[-self.keep:] if self.keep else []
+            pending = [t for t in self._turns[:len(self._turns) - len(recent)]
+                       if t["seq"] > self.through]
+            return [dict(t) for t in recent], self.summary, [dict(t) for t in pending]
+
+    def _apply(self, record):
+        # Caller holds self._lock
+        if record.get("t") == "turn":
+            turn = {"seq": record["seq"], "user": record["user"], "assistant": record["assistant"]}
+            self._turns.append(turn)
+            self._seq = max(self._seq, turn["seq"])
+        elif record.get("t") == "summary":
+            self.summary = record["text"]
+            self.through = max(self.through, record["through"])
+            self._prune()
+
+    def _prune(self):
+        # Caller holds self._lock; drop turns covered by the summary and not recent
+        cutoff = len(self._turns) - self.keep
+        self._turns = [t for i, t in enumerate(self._turns)
+                       if t["seq"] > self.through or i >= cutoff]
+
+    # ---------- Writes ----------
+
+    def append_turn(self, user, assistant):
+        """Log a finished exchange; returns the turn dict (with its seq)."""
+        with self._lock:
+            self._seq += 1
+            turn = {"seq": self._seq, "user": user, "assistant": assistant}
+            self._turns.append(turn)
+            self._write({"t": "turn", **turn})
+        return dict(turn)
+
+    def record_summary(self, summary, turns):
+        """Log a new rolling summary covering the given (evicted) turns."""
+        through = max((t.get("seq", 0) for t in turns), default=0)
+        with self._lock:
+            self.summary = summary
+            self.through = max(self.through, through)
+            self._prune()
+            self._write({"t": "summary", "through": self.through, "text": summary})
+
+    def _write(self, record):
+        # Caller holds self._lock
+        try:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+        except OSError as e:
+            print(f"History: could not write {self.path}: {e}")
+            return
+        self._records += 1
+        self._dirty = True
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="history-log")
+            self._thread.start()
+        if self._needs_compaction():
+            self._wakeup.set()
+
+    # ---------- Background sync ----------
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.fsync_interval)
+            self._wakeup.clear()
+            self.sync()
+
+    def sync(self):
+        """fsync pending appends and compact the log if it grew too long."""
+        with self._lock:
+            # A compacted file is fsynced before it replaces the log
+            compacted = self._needs_compaction() and self._compact()
+            if not compacted and self._dirty and self._file is not None:
+                try:
+                    os.fsync(self._file.fileno())
+                except OSError as e:
+                    print(f"History: fsync failed: {e}")
+            self._dirty = False
+
+    def _needs_compaction(self):
+        # Caller holds self._lock; only compact if it drops enough records
+        return self._records - len(self._turns) - 1 >= self.compact_records
+
+    def _compact(self):
+        # Caller holds self._lock; write atomically, then continue appending to the new file
+        records = []
+        if self.summary:
+            records.append({"t": "summary", "through": self.through, "text": self.summary})
+        records.extend({"t": "turn", **turn} for turn in self._turns)
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"History: compaction failed: {e}")
+            return False
+        self._records = len(records)
+        return True
@@ -0,0 +1,214 @@
+"""Google Home Web Controller - Local memory retrieval engine
+
+A self-contained alternative to the remote SHODH API. Memories live in an
+append-only JSONL file and in compact in-memory arrays:
+
+- an inverted index (term -> doc ids, term frequencies) for BM25
+- an L2-normalized float32 matrix of hashed character-trigram vectors,
+  which catches inflections and compound words that BM25 misses
+
+Recall scores every memory with vectorized NumPy and blends both signals.
+Writes update the index incrementally; the file is only read at load.
+"""
+
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from array import array
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+class _Postings:
+    """Growable doc-id / term-frequency arrays for one term."""
+
+    __slots__ = ("doc_ids", "tfs")
+
+    def __init__(self):
+        self.doc_ids = array("i")
+        self.tfs = array("f")
+
+
+class LocalMemoryBackend:
+    """Hybrid BM25 + vector memory search over a local JSONL store.
+
+    lexical_weight blends the max-normalized BM25 score with the cosine
+    similarity of the hashed trigram vectors (0 = vectors only).
+    """
+
+    name = "local"
+    enabled = True
+
+    def __init__(self, path, dim=128, lexical_weight=0.6):
+        self.path = path
+        self.dim = dim
+        self.lexical_weight = lexical_weight
+        self.records = []  # dicts with id, content, type, tags, created
+        self._postings = {}  # term -> _Postings
+        self._doc_len = array("f")
+        self._vectors = np.zeros((1024, dim), dtype=np.float32)
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    # ---------- Vectorization ----------
+
+    def _vectorize(self, tokens):
+        """Hashed character-trigram vector (sublinear tf, L2-normalized)."""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        buckets = []
+        for token in tokens:
+            padded = f" {token} "
+            for i in range(len(padded) - 2):
+                buckets.append(zlib.crc32(padded[i:i + 3].encode("utf-8")))
+        if not buckets:
+            return vector
+        hashes = np.array(buckets, dtype=np.uint32)
+        # Low bits pick the bucket, bit 31 the sign (reduces collision bias)
+        signs = np.where(hashes >> 31, -1.0, 1.0).astype(np.float32)
+        np.add.at(vector, hashes % self.dim, signs)
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    # ---------- Index maintenance ----------
+
+    def _index(self, record):
+        # Caller holds self._lock (or is load())
+        doc_id = len(self.records)
+        self.records.append(record)
+        tokens = tokenize(record["content"])
+
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for term, count in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = _Postings()
+            postings.doc_ids.append(doc_id)
+            postings.tfs.append(count)
+        self._doc_len.append(len(tokens))
+
+        if doc_id >= len(self._vectors):
+            grown = np.zeros((len(self._vectors) * 2, self.dim), dtype=np.float32)
+            grown[:len(self._vectors)] = self._vectors
+            self._vectors = grown
+        self._vectors[doc_id] = self._vectorize(tokens)
+
+    def load(self):
+        """Read the JSONL store once and build the index."""
+        with self._lock:
+            if self._loaded:
+                return
+            if os.path.exists(self.path):
+                with open(self.path, encoding="utf-8") as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            self._index(json.loads(line))
+                        except ValueError:
+                            continue  # torn last line after a crash
+            self._loaded = True
+
+    def add_many(self, records):
+        """Index records without writing them to disk (bulk import, benchmarks)."""
+        self.load()
+        with self._lock:
+            for record in records:
+                self._index(record)
+
+    # ---------- Backend interface ----------
+
+    def remember(self, content, memory_type="Conversation", tags=None):
+        """Append a memory to the store and index it incrementally."""
+        self.load()
+        record = {
+            "id": os.urandom(8).hex(),
+            "content": content,
+            "type": memory_type,
+            "tags": tags or [],
+            "created": time.time(),
+        }
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self._index(record)
+        return {"id": record["id"], "success": True}
+
+    def recall(self, query, limit=3):
+        """Return the `limit` best memories for a query (hybrid score)."""
+        self.load()
+        tokens = tokenize(query)
+        query_vector = self._vectorize(tokens)
+
+        with self._lock:
+            count = len(self.records)
+            if count == 0:
+                return []
+            # np.array copies: a live view would block array.append in remember()
+            doc_len = np.array(self._doc_len, dtype=np.float32)
+            avg_len = float(doc_len.mean()) or 1.0
+            length_norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len / avg_len)
+
+            lexical = np.zeros(count, dtype=np.float32)
+            for term in set(tokens):
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                ids = np.array(postings.doc_ids, dtype=np.int32)
+                tfs = np.array(postings.tfs, dtype=np.float32)
+                df = len(ids)
+                idf = np.log1p((count - df + 0.5) / (df + 0.5))
+                lexical[ids] += idf * tfs * (BM25_K1 + 1) / (tfs + length_norm[ids])
+
+            semantic = self._vectors[:count] @ query_vector
+            records = self.records  # append-only, indexes below count stay valid
+
+        peak = lexical.max()
+        if peak > 0:
+            lexical /= peak
+        scores = self.lexical_weight * lexical + (1 - self.lexical_weight) * np.clip(semantic, 0, None)
+
+        limit = min(limit, count)
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        results = []
+        for doc_id in top:
+            if scores[doc_id] <= 0:
+                break
+            record = dict(records[doc_id])
+            record["score"] = float(scores[doc_id])
+            results.append(record)
+        return results
+
+    # Scoring is CPU-bound NumPy work: keep it off the event loop
+    async def recall_async(self, query, limit=3):
+        return await asyncio.to_thread(self.recall, query, limit)
+
+    async def remember_async(self, content, memory_type="Conversation", tags=None):
+        return await asyncio.to_thread(self.remember, content, memory_type, tags)
+
+    def context(self, context, max_results=3, auto_ingest=True):
+        memories = self.recall(context, limit=max_results)
+        return {"surfaced_memories": memories, "count": len(memories)}
+
+    def stats(self):
+        self.load()
+        return {"total_memories": len(self.records)}
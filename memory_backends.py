@@ -0,0 +1,170 @@
+"""Google Home Web Controller - Memory backends
+
+The assistant stores and recalls memories through one small interface:
+
+    enabled                         bool, False disables memory entirely
+    recall(query, limit) -> list    memory dicts with at least "content"
+    remember(content, memory_type, tags) -> dict|None
+    context(context, max_results, auto_ingest) -> dict
+    stats() -> dict|None            {"total_memories": n}, None if unreachable
+    recall_async() / remember_async()  awaitable variants for asgi.py
+
+"shodh" talks to the SHODH Cloudflare API, "local" searches a JSONL file
+in-process (see local_memory.py, needs numpy).
+"""
+
+
+class ShodhBackend:
+    """SHODH Cloudflare Memory API over HTTP."""
+
+    name = "shodh"
+
+    def __init__(self, url, api_key):
+        self.url = url
+        self.api_key = api_key
+        self._async_client = None  # httpx.AsyncClient, created on first async call
+
+    @property
+    def enabled(self):
+        return bool(self.api_key)
+
+    def _headers(self):
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+    def recall(self, query, limit=3):
+        """Search for relevant memories using semantic search."""
+        if not self.enabled:
+            return []
+        import requests
+        try:
+            response = requests.post(
+                f"{self.url}/api/recall",
+                headers=self._headers(),
+                json={"query": query, "limit": limit},
+                timeout=5
+            )
+            if response.status_code == 200:
+                return response.json().get("memories", [])
+        except Exception as e:
+            print(f"SHODH recall error: {e}")
+        return []
+
+    def remember(self, content, memory_type="Conversation", tags=None):
+        """Store a new memory in SHODH."""
+        if not self.enabled:
+            return None
+        import requests
+        try:
+            payload = {
+                "content": content,
+                "type": memory_type,
+                "source_type": "ai_generated"
+            }
+            if tags:
+                payload["tags"] = tags
+            response = requests.post(
+                f"{self.url}/api/remember",
+                headers=self._headers(),
+                json=payload,
+                timeout=5
+            )
+            if response.status_code == 200:
+                return response.json()
+        except Exception as e:
+            print(f"SHODH remember error: {e}")
+        return None
+
+    def context(self, context, max_results=3, auto_ingest=True):
+        """Surface relevant memories based on context."""
+        if not self.enabled:
+            return {"surfaced_memories": [], "count": 0}
+        import requests
+        try:
+            response = requests.post(
+                f"{self.url}/api/context",
+                headers=self._headers(),
+                json={
+                    "context": context,
+                    "max_results": max_results,
+                    "auto_ingest": auto_ingest
+                },
+                timeout=5
+            )
+            if response.status_code == 200:
+                return response.json()
+        except Exception as e:
+            print(f"SHODH context error: {e}")
+        return {"surfaced_memories": [], "count": 0}
+
+    def stats(self):
+        if not self.enabled:
+            return None
+        import requests
+        try:
+            response = requests.get(
+                f"{self.url}/api/stats",
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=3
+            )
+            if response.status_code == 200:
+                return response.json()
+        except Exception:
+            pass
+        return None
+
+    # ---------- Async variants (asgi.py) ----------
+
+    def _http(self):
+        if self._async_client is None:
+            import httpx
+            self._async_client = httpx.AsyncClient(timeout=5)
+        return self._async_client
+
+    async def recall_async(self, query, limit=3):
+        if not self.enabled:
+            return []
+        try:
+            response = await self._http().post(
+                f"{self.url}/api/recall",
+                headers=self._headers(),
+                json={"query": query, "limit": limit}
+            )
+            if response.status_code == 200:
+                return response.json().get("memories", [])
+        except Exception as e:
+            print(f"SHODH recall error: {e}")
+        return []
+
+    async def remember_async(self, content, memory_type="Conversation", tags=None):
+        if not self.enabled:
+            return None
+        payload = {
+            "content": content,
+            "type": memory_type,
+            "source_type": "ai_generated"
+        }
+        if tags:
+            payload["tags"] = tags
+        try:
+            response = await self._http().post(
+                f"{self.url}/api/remember", headers=self._headers(), json=payload
+            )
+            if response.status_code == 200:
+                return response.json()
+        except Exception as e:
+            print(f"SHODH remember error: {e}")
+        return None
+
+
+def create_memory_backend(kind, shodh_url="", shodh_api_key="", local_path="memories.jsonl"):
+    """Build the configured backend ("shodh" or "local")."""
+    if kind == "local":
+        # Imported lazily so numpy is only needed when the local engine is used
+        from local_memory import LocalMemoryBackend
+        return LocalMemoryBackend(local_path)
+    if kind != "shodh":
+        print(f"Unknown MEMORY_BACKEND '{kind}', falling back to shodh")
+    return ShodhBackend(shodh_url, shodh_api_key)
@@ -0,0 +1,91 @@
+"""Google Home Web Controller - Pre-synthesized phrase bank
+
+Short fixed replies (memory confirmations, error messages) are rendered
+once with the configured voice and reused, so they can be played without
+another TTS round trip. Files are named after a hash of voice and text,
+so renders from a previous run are picked up again after a restart.
+"""
+
+import hashlib
+import os
+import re
+import threading
+
+PHRASE_PREFIX = "phrase_"
+
+
+def normalize_phrase(text):
+    """Normalize text for matching (case, whitespace, trailing punctuation)."""
+    text = re.sub(r"\s+", " ", text.strip().lower())
+    return text.rstrip(".!? ")
+
+
+class PhraseBank:
+    """Keeps a fixed set of phrases rendered as audio files.
+
+    synthesize(text, filepath) renders one phrase (blocking).
+    """
+
+    def __init__(self, phrases, voice, audio_dir, synthesize):
+        self.voice = voice
+        self.audio_dir = audio_dir
+        self.synthesize = synthesize
+        self._files = {}  # normalized text -> (text, filename)
+        for text in phrases:
+            self._files[normalize_phrase(text)] = (text, self.filename_for(text))
+        self._lock = threading.Lock()
+        self._warming = False
+
+    def filename_for(self, text):
+        digest = hashlib.sha1(f"{self.voice}|{text}".encode("utf-8")).hexdigest()[:12]
+        return f"{PHRASE_PREFIX}{digest}.mp3"
+
+    def lookup(self, text):
+        """Return the audio filename for a phrase if it is rendered, else None.
+
+        A known phrase whose file is missing (e.g. /tmp was cleaned) is
+        re-rendered in the background.
+        """
+        entry = self._files.get(normalize_phrase(text))
+        if not entry:
+            return None
+        filename = entry[1]
+        if os.path.exists(os.path.join(self.audio_dir, filename)):
+            return filename
+        self.warm_in_background()
+        return None
+
+    def warm(self):
+        """Render all phrases whose audio file is missing; returns the count rendered."""
+        rendered = 0
+        for text, filename in list(self._files.values()):
+            filepath = os.path.join(self.audio_dir, filename)
+            if os.path.exists(filepath):
+                continue
+            # Render to a temp name so lookup() never sees a partial file
+            tmp_path = filepath + ".part"
+            try:
+                self.synthesize(text, tmp_path)
+                os.replace(tmp_path, filepath)
+                rendered += 1
+            except Exception as e:
+                print(f"Phrase bank render error ({text[:30]}): {e}")
+        return rendered
+
+    def warm_in_background(self):
+        """Start warm() on a daemon thread unless one is already running."""
+        with self._lock:
+            if self._warming:
+                return
+            self._warming = True
+
+        def run():
+            try:
+                rendered = self.warm()
+                if rendered:
+                    print(f"Phrase bank: rendered {rendered} phrase(s)")
+            finally:
+                with self._lock:
+                    self._warming = False
+
+        threading.Thread(target=run, daemon=True).start()
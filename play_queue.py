@@ -0,0 +1,199 @@
+"""Google Home Web Controller - Server-side play queue
+
+Each device has a queue of items (radio stations, YouTube favorites, TTS
+clips). While one item plays, the next one is resolved in the background
+(stream URL lookup, TTS rendering), and it is cast as soon as the device
+reports the current item finished, without the usual stop/sleep cycle.
+
+Radio streams never end on their own; use next() to move on.
+"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Seconds after a cast during which IDLE is treated as "still loading"
+START_GRACE = 10.0
+
+# Poll interval bounds while waiting for the current item to end
+MIN_POLL = 0.3
+MAX_POLL = 5.0
+
+_item_ids = itertools.count(1)
+_prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="queue-prefetch")
+
+
+class QueueItem:
+    """One entry of a play queue.
+
+    source is a URL for radio/youtube items and the text for tts items.
+    """
+
+    def __init__(self, item_type, name, source):
+        self.id = next(_item_ids)
+        self.type = item_type
+        self.name = name
+        self.source = source
+        self.prefetch = None  # Future resolving to the cast URL
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "type": self.type,
+            "name": self.name,
+            "prefetched": bool(self.prefetch and self.prefetch.done()),
+        }
+
+
+class PlayQueue:
+    """Playback queue for one device.
+
+    resolve(item) -> url       prepares an item for casting (blocking)
+    cast(url) -> (ok, message) starts playback on the device
+    get_status() -> dict|None  parsed device info, None if nothing plays
+    on_start(item)             called after an item started playing
+    """
+
+    def __init__(self, device, resolve, cast, get_status, on_start=None):
+        self.device = device
+        self.resolve = resolve
+        self.cast = cast
+        self.get_status = get_status
+        self.on_start = on_start
+        self.items = []
+        self.current = None
+        self.active = False
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._skip = False
+        self._generation = 0  # bumped by play() so a stopped runner never resumes
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "device": self.device,
+                "active": self.active,
+                "current": self.current.to_dict() if self.current else None,
+                "items": [item.to_dict() for item in self.items],
+            }
+
+    def enqueue(self, item):
+        """Append an item; prefetch it right away if it plays next."""
+        with self._lock:
+            self.items.append(item)
+            if self.active and len(self.items) == 1:
+                self._prefetch(item)
+        return item
+
+    def remove(self, item_id):
+        with self._lock:
+            before = len(self.items)
+            self.items = [item for item in self.items if item.id != item_id]
+            return len(self.items) != before
+
+    def clear(self):
+        with self._lock:
+            self.items = []
+
+    def play(self):
+        """Start playing the queue (no-op if it is already running)."""
+        with self._lock:
+            if self.active or not self.items:
+                return False
+            self.active = True
+            self._generation += 1
+            self._skip = False
+            self._wakeup.clear()
+            self._prefetch(self.items[0])
+            generation = self._generation
+        threading.Thread(target=self._run, args=(generation,), daemon=True).start()
+        return True
+
+    def next(self):
+        """Skip to the next item immediately."""
+        with self._lock:
+            if not self.active:
+                return False
+            self._skip = True
+        self._wakeup.set()
+        return True
+
+    def stop(self):
+        """Stop advancing; the device keeps playing whatever it plays."""
+        with self._lock:
+            self.active = False
+            self.current = None
+        self._wakeup.set()
+
+    def _prefetch(self, item):
+        # Caller holds self._lock
+        if item.prefetch is None:
+            item.prefetch = _prefetch_pool.submit(self.resolve, item)
+
+    def _running(self, generation):
+        # Caller holds self._lock
+        return self.active and generation == self._generation
+
+    def _run(self, generation):
+        while True:
+            with self._lock:
+                if not self._running(generation):
+                    return
+                if not self.items:
+                    self.active = False
+                    self.current = None
+                    return
+                item = self.items.pop(0)
+                self._prefetch(item)
+                self._skip = False
+                self._wakeup.clear()
+
+            try:
+                url = item.prefetch.result()
+                # Resolving can take seconds; don't override what the user
+                # started via radio/youtube/stop/assistant in the meantime
+                with self._lock:
+                    if not self._running(generation):
+                        return
+                ok, message = self.cast(url)
+            except Exception as e:
+                ok, message = False, str(e)
+            if not ok:
+                print(f"Queue: could not play {item.name}: {message}")
+                continue
+
+            with self._lock:
+                if not self._running(generation):
+                    return
+                self.current = item
+                # Resolve the next item while this one plays
+                if self.items:
+                    self._prefetch(self.items[0])
+            if self.on_start:
+                self.on_start(item)
+
+            self._wait_until_finished(generation)
+
+    def _wait_until_finished(self, generation):
+        """Block until the current item ended, next() or stop() was called."""
+        started = False  # device reported playback for this item
+        cast_at = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._running(generation) or self._skip:
+                    return
+            status = self.get_status()
+            state = status.get("player_state") if status else "IDLE"
+            if state in ("PLAYING", "BUFFERING", "PAUSED"):
+                started = True
+            elif started or time.monotonic() - cast_at > START_GRACE:
+                return
+
+            timeout = MAX_POLL
+            if status and status.get("duration"):
+                remaining = status["duration"] - status.get("current_time", 0)
+                timeout = max(MIN_POLL, min(MAX_POLL, remaining - MIN_POLL))
+            elif not started:
+                timeout = MIN_POLL
+            self._wakeup.wait(timeout)
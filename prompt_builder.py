@@ -0,0 +1,200 @@
+"""Google Home Web Controller - Token-budgeted prompt builder
+
+Builds LLM message lists with a stable prefix and a bounded size:
+
+    persona (static)  ->  rolling summary  ->  recent turns  ->  request context  ->  user text
+
+The persona always comes first and never changes, so providers that cache
+prompt prefixes can reuse it. Older turns are folded into a rolling summary
+by a background thread (HistorySummarizer) instead of being sent verbatim.
+"""
+
+import queue
+import threading
+
+# Llama/Gemini tokenizers average roughly 3.5 characters per token on
+# German text; good enough for budgeting without shipping a tokenizer.
+CHARS_PER_TOKEN = 3.5
+
+# Per-message overhead of the chat format (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PREFIX = "Bisheriges Gespräch (Zusammenfassung):\n"
+
+
+def count_tokens(text):
+    """Estimate the number of tokens in a text."""
+    if not text:
+        return 0
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+def message_tokens(message):
+    """Estimate the number of tokens a chat message costs."""
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text so it fits into max_tokens (marks the cut with '...')."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    max_chars = int(max_tokens * CHARS_PER_TOKEN) - 3
+    if max_chars <= 0:
+        return ""
+    return text[:max_chars].rstrip() + "..."
+
+
+class PromptBuilder:
+    """Assemble chat messages within an input token budget.
+
+    Priority when the budget is tight: persona and user text are always
+    sent, then the per-request context (truncated if needed), then the
+    rolling summary, then as many recent turns as fit, newest first.
+    """
+
+    def __init__(self, persona, token_budget, max_history):
+        self.persona = persona
+        self.token_budget = token_budget
+        self.max_history = max_history
+        self._persona_message = {"role": "system", "content": persona}
+
+    def build(self, text, history, summary="", context=()):
+        """Return (messages, estimated_tokens) for a request.
+
+        history is a list of {"user": ..., "assistant": ...} exchanges,
+        oldest first. context is a sequence of strings for this request only
+        (memory recall, instructions).
+        """
+        user_message = {"role": "user", "content": text}
+        used = message_tokens(self._persona_message) + message_tokens(user_message)
+
+        # Per-request context goes right before the user text so everything
+        # above it stays identical between turns
+        context_message = None
+        context_text = "\n\n".join(part for part in context if part)
+        if context_text:
+            available = self.token_budget - used - MESSAGE_OVERHEAD_TOKENS
+            context_text = truncate_to_tokens(context_text, available) if available > 0 else ""
+            if context_text:
+                context_message = {"role": "system", "content": context_text}
+                used += message_tokens(context_message)
+
+        summary_message = None
+        if summary:
+            candidate = {"role": "system", "content": SUMMARY_PREFIX + summary}
+            if used + message_tokens(candidate) <= self.token_budget:
+                summary_message = candidate
+                used += message_tokens(candidate)
+
+        turns = []
+        for exchange in reversed(history[-self.max_history:]):
+            pair = [
+                {"role": "user", "content": exchange["user"]},
+                {"role": "assistant", "content": exchange["assistant"]},
+            ]
+            cost = sum(message_tokens(m) for m in pair)
+            if used + cost > self.token_budget:
+                break
+            turns[:0] = pair
+            used += cost
+
+        messages = [self._persona_message]
+        if summary_message:
+            messages.append(summary_message)
+        messages.extend(turns)
+        if context_message:
+            messages.append(context_message)
+        messages.append(user_message)
+        return messages, used
+
+
+def to_gemini_contents(messages):
+    """Convert builder messages to Gemini contents.
+
+    The leading persona message is skipped (pass it as the model's
+    system_instruction instead); later system messages are prepended to
+    the following user turn.
+    """
+    contents = []
+    pending_context = []
+    for message in messages[1:]:
+        if message["role"] == "system":
+            pending_context.append(message["content"])
+        elif message["role"] == "user":
+            text = "\n\n".join(pending_context + [message["content"]])
+            pending_context = []
+            contents.append({"role": "user", "parts": [text]})
+        elif message["role"] == "assistant":
+            contents.append({"role": "model", "parts": [message["content"]]})
+    return contents
+
+
+def fallback_summary(previous, turns, max_tokens):
+    """Extractive summary used when no LLM is available for summarizing."""
+    lines = [previous] if previous else []
+    for exchange in turns:
+        lines.append(f"Benutzer: {exchange['user']} / Leni: {exchange['assistant']}")
+    text = "\n".join(lines)
+    # Keep the most recent part
+    max_chars = int(max_tokens * CHARS_PER_TOKEN)
+    return text[-max_chars:] if len(text) > max_chars else text
+
+
+class HistorySummarizer:
+    """Fold evicted conversation turns into a rolling summary off the hot path.
+
+    summarize_fn(previous_summary, turns, max_tokens) -> str is called on a
+    background thread; on failure the extractive fallback is used.
+    on_update(summary, turns), if given, is called after each new summary.
+    """
+
+    def __init__(self, summarize_fn, max_tokens, on_update=None):
+        self.summarize_fn = summarize_fn
+        self.max_tokens = max_tokens
+        self.on_update = on_update
+        self._summary = ""
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._worker = None
+
+    @property
+    def summary(self):
+        with self._lock:
+            return self._summary
+
+    def reset(self, summary=""):
+        with self._lock:
+            self._summary = summary
+
+    def submit(self, turns):
+        """Queue evicted turns for summarization (returns immediately)."""
+        if not turns:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+        self._queue.put(list(turns))
+
+    def _run(self):
+        while True:
+            turns = self._queue.get()
+            # Merge everything that queued up while the last summary was running
+            while not self._queue.empty():
+                turns.extend(self._queue.get_nowait())
+            previous = self.summary
+            try:
+                summary = self.summarize_fn(previous, turns, self.max_tokens)
+            except Exception as e:
+                print(f"History summary error: {e}")
+                summary = None
+            if not summary:
+                summary = fallback_summary(previous, turns, self.max_tokens)
+            with self._lock:
+                self._summary = truncate_to_tokens(summary.strip(), self.max_tokens)
+                summary = self._summary
+            if self.on_update:
+                try:
+                    self.on_update(summary, turns)
+                except Exception as e:
+                    print(f"History summary callback error: {e}")
@@ -0,0 +1,122 @@
+"""Google Home Web Controller - In-flight request deduplication
+
+The voice UI can submit the same utterance twice (silence timer and manual
+send racing each other). Requests with the same key attach to the one
+already running instead of paying for a second LLM + TTS + cast round, and
+a successful result is reused for a short window after it finished.
+"""
+
+import asyncio
+import re
+import threading
+import time
+
+_NON_WORD_RE = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_text(text):
+    """Case-, whitespace- and punctuation-insensitive form of an utterance."""
+    return _NON_WORD_RE.sub(" ", text.lower()).strip()
+
+
+class _Call:
+    __slots__ = ("done", "waiters", "result", "error", "finished_at")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.waiters = []  # futures of async followers
+        self.result = None
+        self.error = None
+        self.finished_at = None
+
+
+class InflightDeduplicator:
+    """Run fn once per key; concurrent callers with the same key share the result.
+
+    keep(result) decides whether a finished result may be reused by
+    callers arriving within `window` seconds after it completed.
+    """
+
+    def __init__(self, window, keep=None):
+        self.window = window
+        self.keep = keep or (lambda result: True)
+        self.shared = 0
+        self._calls = {}  # key -> _Call
+        self._lock = threading.Lock()
+
+    def run(self, key, fn):
+        """Return (result, shared); shared is True if another caller computed it."""
+        call, leader = self._join(key)
+        if not leader:
+            call.done.wait()
+            return self._shared_result(call)
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result, False
+
+    async def run_async(self, key, fn):
+        """Async variant of run(); fn is a coroutine function."""
+        call, leader = self._join(key)
+        if not leader:
+            with self._lock:
+                waiter = None
+                if not call.done.is_set():
+                    waiter = asyncio.get_running_loop().create_future()
+                    call.waiters.append(waiter)
+            if waiter is not None:
+                await waiter
+            return self._shared_result(call)
+        try:
+            call.result = await fn()
+        except BaseException as e:  # includes cancellation of the leader
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result, False
+
+    def _join(self, key):
+        with self._lock:
+            self._expire_locked()
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                return call, False
+            call = self._calls[key] = _Call()
+            return call, True
+
+    def _finish(self, key, call):
+        with self._lock:
+            call.finished_at = time.monotonic()
+            if call.error is not None or not self.keep(call.result):
+                self._calls.pop(key, None)
+            call.done.set()
+            waiters, call.waiters = call.waiters, []
+        # Async leaders finish on the loop their followers wait on
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    @staticmethod
+    def _shared_result(call):
+        if call.error is not None:
+            raise call.error
+        return call.result, True
+
+    def _expire_locked(self):
+        # Caller holds self._lock
+        now = time.monotonic()
+        expired = [key for key, call in self._calls.items()
+                   if call.finished_at is not None and now - call.finished_at > self.window]
+        for key in expired:
+            del self._calls[key]
+
+    def stats(self):
+        with self._lock:
+            in_flight = sum(1 for call in self._calls.values() if call.finished_at is None)
+            return {"in_flight": in_flight, "shared": self.shared}
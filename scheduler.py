@@ -0,0 +1,223 @@
+"""Google Home Web Controller - Scheduled playback and announcements
+
+Jobs ("SRF 4 News at 07:00", spoken reminders) live in a timer heap served
+by one thread that sleeps until the next event, so nothing polls while
+idle. A few seconds before a job is due it is prepared (stream URL
+resolved, TTS rendered, device touched) so that firing only has to cast.
+
+Jobs are persisted as JSON and reloaded at startup.
+"""
+
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+REPEAT_DAILY = "daily"
+
+# Missed one-shot jobs younger than this still fire after a restart
+MISSED_GRACE = 60.0
+
+# Upper bound for firing early to compensate for the cast latency
+MAX_FIRE_EARLY = 5.0
+
+
+def next_daily(time_of_day, now=None):
+    """Epoch of the next occurrence of "HH:MM" or "HH:MM:SS" (local time)."""
+    now = now or datetime.now()
+    parts = [int(p) for p in time_of_day.split(":")]
+    if len(parts) not in (2, 3):
+        raise ValueError(f"Invalid time '{time_of_day}', expected HH:MM")
+    hour, minute, second = (parts + [0])[:3]
+    target = now.replace(hour=hour, minute=minute, second=second, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return target.timestamp()
+
+
+class Scheduler:
+    """Timer-heap scheduler with pre-warming and JSON persistence.
+
+    prepare(action) -> prepared   runs `prewarm` seconds before a job
+    execute(action, prepared)     runs at the due time; prepared is None
+                                  if preparation failed or was skipped
+    """
+
+    def __init__(self, path, prepare, execute, prewarm=10.0):
+        self.path = path
+        self.prepare = prepare
+        self.execute = execute
+        self.prewarm = prewarm
+        self.jobs = {}  # id -> job dict
+        self.cast_latency = 0.0  # EWMA of execute() duration, used to fire early
+        self._heap = []  # (when, seq, kind, job_id, due)
+        self._seq = itertools.count()
+        self._prepared = {}  # (job_id, due) -> {"done": Event, "value": prepared}
+        self._cond = threading.Condition()
+        self._thread = None
+
+    # ---------- Persistence ----------
+
+    def load(self):
+        """Load persisted jobs, dropping one-shot jobs that were missed."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                jobs = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Scheduler: could not load {self.path}: {e}")
+            return
+
+        now = time.time()
+        with self._cond:
+            for job in jobs:
+                if job.get("repeat") == REPEAT_DAILY and job["due"] < now:
+                    job["due"] = next_daily(job["time"])
+                elif job["due"] < now - MISSED_GRACE:
+                    print(f"Scheduler: dropping missed job {job['id']} ({job['label']})")
+                    continue
+                self.jobs[job["id"]] = job
+                self._push(job)
+            self._save()
+
+    def _save(self):
+        # Caller holds self._cond; write atomically so a crash never truncates the file
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(sorted(self.jobs.values(), key=lambda j: j["due"]), f,
+                          ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Scheduler: could not save {self.path}: {e}")
+
+    # ---------- Jobs ----------
+
+    def add(self, action, due=None, time_of_day=None, repeat=None, label=""):
+        """Schedule an action at an epoch `due` or a daily/next `time_of_day`."""
+        if time_of_day:
+            due = next_daily(time_of_day)
+        if due is None:
+            raise ValueError("Either due or time_of_day is required")
+        if repeat == REPEAT_DAILY and not time_of_day:
+            time_of_day = datetime.fromtimestamp(due).strftime("%H:%M:%S")
+        job = {
+            "id": uuid.uuid4().hex[:8],
+            "action": action,
+            "due": due,
+            "time": time_of_day,
+            "repeat": repeat,
+            "label": label,
+        }
+        with self._cond:
+            self.jobs[job["id"]] = job
+            self._push(job)
+            self._save()
+            self._cond.notify()
+        return job
+
+    def remove(self, job_id):
+        with self._cond:
+            job = self.jobs.pop(job_id, None)
+            if job is None:
+                return False
+            # Heap entries of removed jobs are skipped lazily, prepared slots are not
+            for key in [key for key in self._prepared if key[0] == job_id]:
+                del self._prepared[key]
+            self._save()
+            self._cond.notify()
+            return True
+
+    def snapshot(self):
+        with self._cond:
+            return sorted((dict(job) for job in self.jobs.values()), key=lambda j: j["due"])
+
+    def _push(self, job):
+        # Caller holds self._cond
+        due = job["due"]
+        heapq.heappush(self._heap, (due - self.prewarm, next(self._seq), "prepare", job["id"], due))
+        fire_at = due - min(self.cast_latency, MAX_FIRE_EARLY)
+        heapq.heappush(self._heap, (fire_at, next(self._seq), "fire", job["id"], due))
+
+    # ---------- Timer thread ----------
+
+    def start(self):
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="scheduler")
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if not self._heap:
+                        self._cond.wait()  # idle: sleep until a job is added
+                        continue
+                    when, _, kind, job_id, due = self._heap[0]
+                    job = self.jobs.get(job_id)
+                    if job is None or job["due"] != due:
+                        heapq.heappop(self._heap)  # removed or rescheduled
+                        continue
+                    delay = when - time.time()
+                    if delay > 0:
+                        self._cond.wait(delay)
+                        continue
+                    heapq.heappop(self._heap)
+                    if kind == "prepare":
+                        slot = {"done": threading.Event(), "value": None}
+                        self._prepared[(job_id, due)] = slot
+                        args = (job, slot)
+                    else:
+                        args = (job, due)
+                    break
+
+            # Run outside the timer thread so a slow cast never delays other jobs
+            target = self._prepare if kind == "prepare" else self._fire
+            threading.Thread(target=target, args=args, daemon=True).start()
+
+    def _prepare(self, job, slot):
+        try:
+            slot["value"] = self.prepare(job["action"])
+        except Exception as e:
+            print(f"Scheduler: preparing {job['label']} failed: {e}")
+        finally:
+            slot["done"].set()
+
+    def _fire(self, job, due):
+        with self._cond:
+            slot = self._prepared.pop((job["id"], due), None)
+        prepared = None
+        if slot is not None:
+            # Preparation still running (slow TTS/network): wait briefly for it
+            slot["done"].wait(self.prewarm)
+            prepared = slot["value"]
+
+        # Hold the start until the due second if we woke early
+        early = due - time.time() - min(self.cast_latency, MAX_FIRE_EARLY)
+        if early > 0:
+            time.sleep(early)
+
+        started = time.monotonic()
+        try:
+            self.execute(job["action"], prepared)
+        except Exception as e:
+            print(f"Scheduler: running {job['label']} failed: {e}")
+        elapsed = time.monotonic() - started
+        self.cast_latency = 0.7 * self.cast_latency + 0.3 * elapsed if self.cast_latency else elapsed
+
+        with self._cond:
+            if job["id"] not in self.jobs:
+                return
+            if job.get("repeat") == REPEAT_DAILY:
+                # Count from the due time: we may have fired a moment early
+                job["due"] = next_daily(job["time"], now=datetime.fromtimestamp(due))
+                self._push(job)
+            else:
+                del self.jobs[job["id"]]
+            self._save()
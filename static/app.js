@@ -1,5 +1,5 @@
 // Google Home Web Controller - Frontend JS
-// Version 1.0.7
+// Version 1.0.8
 
 // Debug log (toggle by clicking version number, persisted in localStorage)
 const debugLog = document.getElementById('debugLog');
@@ -9,7 +9,7 @@ let debugEnabled = localStorage.getItem('ghome_debug') === 'true';
 // Apply saved debug state on load
 if (debugEnabled && debugLog) {
     debugLog.classList.add('active');
-    if (versionInfo) versionInfo.textContent = 'v1.0.7 [DBG]';
+    if (versionInfo) versionInfo.textContent = 'v1.0.8 [DBG]';
 }
 
 // Toggle debug log by clicking version number
@@ -19,7 +19,7 @@ if (versionInfo) {
         debugEnabled = !debugEnabled;
         localStorage.setItem('ghome_debug', debugEnabled);
         debugLog.classList.toggle('active', debugEnabled);
-        versionInfo.textContent = debugEnabled ? 'v1.0.7 [DBG]' : 'v1.0.7';
+        versionInfo.textContent = debugEnabled ? 'v1.0.8 [DBG]' : 'v1.0.8';
     });
 }
 
@@ -719,6 +719,11 @@ async function sendWithVoice(text) {
             }
         } else {
             showError(data.error || 'Fehler bei der Verarbeitung');
+
+            // Server sends a pre-rendered spoken error for browser playback
+            if (!toGoogleHome && data.audio_url) {
+                playBrowserAudio(data.audio_url);
+            }
         }
     } catch (error) {
         showError('Verbindungsfehler');
@@ -732,7 +737,8 @@ function showResponse(question, answer, memoryCount = 0, memoryStored = false) {
     assistantElements.response.className = 'chat-response';
     let memoryInfo = '';
     if (memoryStored) {
-        memoryInfo = ' <span style="color: #4ade80; font-size: 0.7rem;" title="Gespeichert">💾</span>';
+        const title = memoryStored === 'pending' ? 'Wird gespeichert' : 'Gespeichert';
+        memoryInfo = ` <span style="color: #4ade80; font-size: 0.7rem;" title="${title}">💾</span>`;
     }
     if (memoryCount > 0) {
         memoryInfo += ` <span style="color: var(--accent); font-size: 0.7rem;">(${memoryCount} 🧠)</span>`;